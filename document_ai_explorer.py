@@ -6,14 +6,23 @@ This script processes a PDF invoice through Document AI and displays
 all available extracted information in a structured format.
 """
 
-import json
+import argparse
+import asyncio
+import functools
+import gzip
+import itertools
 import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
+from google.api_core import exceptions, retry_async
 from google.cloud import documentai
+from google.protobuf import json_format
 
 
-def setup_client():
-    """Initialize Document AI client with project configuration."""
+def get_processor_name():
+    """Build the Document AI processor resource name from the environment."""
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT_ID")
     location = os.getenv("GOOGLE_CLOUD_LOCATION", "us")
     processor_id = os.getenv("DOCUMENT_AI_PROCESSOR_ID")
@@ -24,156 +33,200 @@ def setup_client():
             "GOOGLE_CLOUD_PROJECT_ID and DOCUMENT_AI_PROCESSOR_ID"
         )
 
+    return documentai.DocumentProcessorServiceClient.processor_path(
+        project_id, location, processor_id
+    )
+
+
+# Sections printed by display_document, in display order
+DISPLAY_SECTIONS = ("pages", "entities", "forms", "tables", "text")
+
+
+@functools.lru_cache(maxsize=1)
+def setup_client():
+    """Initialize Document AI client with project configuration (cached)."""
     client = documentai.DocumentProcessorServiceClient()
-    processor_name = client.processor_path(project_id, location, processor_id)
+    processor_name = get_processor_name()
 
     return client, processor_name
 
 
 def display_entities(document):
     """Display all extracted entities with confidence scores."""
-    print("\n" + "=" * 60)
-    print("DOCUMENT ENTITIES")
-    print("=" * 60)
+    lines = ["\n" + "=" * 60, "DOCUMENT ENTITIES", "=" * 60]
 
-    if not document.entities:
-        print("No entities found.")
+    # Walk the raw protobuf message; proto-plus wrappers cost a marshal per access
+    entities = documentai.Document.pb(document).entities
+    if not entities:
+        lines.append("No entities found.")
+        print("\n".join(lines))
         return
 
-    for i, entity in enumerate(document.entities, 1):
-        print(f"\n[{i}] Entity: {entity.type_}")
-        print(f"    Text: {entity.mention_text}")
-        print(f"    Confidence: {entity.confidence:.3f}")
+    for i, entity in enumerate(entities, 1):
+        lines.append(f"\n[{i}] Entity: {entity.type_}")
+        lines.append(f"    Text: {entity.mention_text}")
+        lines.append(f"    Confidence: {entity.confidence:.3f}")
 
-        if entity.normalized_value:
-            print(f"    Normalized: {entity.normalized_value.text}")
+        if entity.normalized_value.ListFields():
+            lines.append(f"    Normalized: {entity.normalized_value.text}")
 
-        if hasattr(entity, "properties") and entity.properties:
-            print("    Properties:")
+        if entity.properties:
+            lines.append("    Properties:")
             for prop in entity.properties:
-                print(
+                lines.append(
                     f"      {prop.type_}: {prop.mention_text} (conf: {prop.confidence:.3f})"
                 )
 
+    print("\n".join(lines))
+
 
-def display_form_fields(document):
+def display_form_fields(document, pages=None, document_text=None):
     """Display form fields found in the document."""
-    print("\n" + "=" * 60)
-    print("FORM FIELDS")
-    print("=" * 60)
+    lines = ["\n" + "=" * 60, "FORM FIELDS", "=" * 60]
 
     form_fields_found = False
+    if pages is None:
+        pages = documentai.Document.pb(document).pages
+    if document_text is None:
+        document_text = document.text
 
-    for page in document.pages:
-        if hasattr(page, "form_fields") and page.form_fields:
+    for page in pages:
+        if page.form_fields:
             form_fields_found = True
             for i, field in enumerate(page.form_fields, 1):
                 field_name = (
-                    get_text_from_layout(field.field_name, document.text)
-                    if field.field_name
+                    get_text_from_layout(field.field_name, document_text)
+                    if field.field_name.ListFields()
                     else "Unknown"
                 )
                 field_value = (
-                    get_text_from_layout(field.field_value, document.text)
-                    if field.field_value
+                    get_text_from_layout(field.field_value, document_text)
+                    if field.field_value.ListFields()
                     else "No value"
                 )
 
-                print(f"\n[{i}] {field_name}: {field_value}")
-                if hasattr(field, "confidence"):
-                    print(f"    Confidence: {field.confidence:.3f}")
+                lines.append(f"\n[{i}] {field_name}: {field_value}")
 
     if not form_fields_found:
-        print("No form fields found.")
+        lines.append("No form fields found.")
 
+    print("\n".join(lines))
 
-def display_tables(document):
+
+def extract_tables(document, pages=None, document_text=None):
+    """Resolve the text of every table cell in the document in one walk."""
+    if pages is None:
+        pages = documentai.Document.pb(document).pages
+    if document_text is None:
+        document_text = document.text
+    tables = []
+
+    for page_num, page in enumerate(pages, 1):
+        for table_num, table in enumerate(page.tables, 1):
+            table_data = [
+                [
+                    get_text_from_layout(cell.layout, document_text).strip()
+                    for cell in row.cells
+                ]
+                for row in itertools.chain(table.header_rows, table.body_rows)
+            ]
+            tables.append((page_num, table_num, table_data))
+
+    return tables
+
+
+def display_tables(document, pages=None, document_text=None):
     """Display all tables found in the document."""
-    print("\n" + "=" * 60)
-    print("TABLES")
-    print("=" * 60)
-
-    tables_found = False
-
-    for page_num, page in enumerate(document.pages, 1):
-        if hasattr(page, "tables") and page.tables:
-            tables_found = True
-            for table_num, table in enumerate(page.tables, 1):
-                print(f"\n--- Page {page_num}, Table {table_num} ---")
-
-                # Extract table data
-                table_data = []
-                for row in table.table_rows:
-                    row_data = []
-                    for cell in row.cells:
-                        cell_text = get_text_from_layout(cell.layout, document.text)
-                        row_data.append(cell_text.strip())
-                    table_data.append(row_data)
-
-                # Display table
-                if table_data:
-                    # Calculate column widths
-                    col_widths = []
-                    if table_data:
-                        max_cols = max(len(row) for row in table_data)
-                        for col in range(max_cols):
-                            max_width = max(
-                                len(str(row[col])) if col < len(row) else 0
-                                for row in table_data
-                            )
-                            col_widths.append(min(max_width, 30))  # Cap at 30 chars
-
-                    # Print table rows
-                    for row_num, row in enumerate(table_data):
-                        row_str = " | ".join(
-                            (
-                                str(cell)[:30].ljust(col_widths[i])
-                                if i < len(col_widths)
-                                else str(cell)[:30]
-                            )
-                            for i, cell in enumerate(row)
-                        )
-                        print(f"  {row_str}")
-
-                        # Add separator after header row
-                        if row_num == 0 and len(table_data) > 1:
-                            separator = "-+-".join("-" * width for width in col_widths)
-                            print(f"  {separator}")
-
-    if not tables_found:
-        print("No tables found.")
-
-
-def display_raw_text(document):
+    lines = ["\n" + "=" * 60, "TABLES", "=" * 60]
+
+    tables = extract_tables(document, pages, document_text)
+
+    for page_num, table_num, table_data in tables:
+        lines.append(f"\n--- Page {page_num}, Table {table_num} ---")
+
+        # Display table
+        if table_data:
+            # Calculate column widths in a single pass (capped at 30 chars)
+            col_widths = []
+            for row in table_data:
+                for i, cell in enumerate(row):
+                    width = min(len(cell), 30)
+                    if i >= len(col_widths):
+                        col_widths.append(width)
+                    elif width > col_widths[i]:
+                        col_widths[i] = width
+
+            # Print table rows through one %-template per row length
+            # (cells truncated to 30 chars, left-justified to the column width)
+            row_templates = {}
+            for row_num, row in enumerate(table_data):
+                row_template = row_templates.get(len(row))
+                if row_template is None:
+                    row_template = "  " + " | ".join(
+                        "%%-%d.30s" % width for width in col_widths[: len(row)]
+                    )
+                    row_templates[len(row)] = row_template
+                lines.append(row_template % tuple(row))
+
+                # Add separator after header row
+                if row_num == 0 and len(table_data) > 1:
+                    separator = "-+-".join("-" * width for width in col_widths)
+                    lines.append(f"  {separator}")
+
+    if not tables:
+        lines.append("No tables found.")
+
+    print("\n".join(lines))
+
+
+def display_raw_text(document, document_text=None):
     """Display the raw extracted text."""
-    print("\n" + "=" * 60)
-    print("RAW EXTRACTED TEXT")
-    print("=" * 60)
-    print(document.text)
+    print("\n".join(["\n" + "=" * 60, "RAW EXTRACTED TEXT", "=" * 60]))
+
+    if document_text is None:
+        document_text = document.text
+
+    stdout_buffer = getattr(sys.stdout, "buffer", None)
+    if stdout_buffer is None:
+        print(document_text)
+        return
+
+    # Hand the (potentially multi-MB) text to the binary buffer in one write
+    sys.stdout.flush()
+    stdout_buffer.write(
+        document_text.encode(sys.stdout.encoding or "utf-8", sys.stdout.errors)
+    )
+    stdout_buffer.write(b"\n")
+    stdout_buffer.flush()
 
 
-def display_page_info(document):
+def display_page_info(document, pages=None):
     """Display page-level information."""
-    print("\n" + "=" * 60)
-    print("PAGE INFORMATION")
-    print("=" * 60)
+    lines = ["\n" + "=" * 60, "PAGE INFORMATION", "=" * 60]
 
-    for i, page in enumerate(document.pages, 1):
-        print(f"\nPage {i}:")
-        print(f"  Dimensions: {page.dimension.width:.1f} x {page.dimension.height:.1f}")
-        print(f"  Unit: {page.dimension.unit}")
+    if pages is None:
+        pages = documentai.Document.pb(document).pages
+
+    for i, page in enumerate(pages, 1):
+        lines.append(f"\nPage {i}:")
+        lines.append(
+            f"  Dimensions: {page.dimension.width:.1f} x {page.dimension.height:.1f}"
+        )
+        lines.append(f"  Unit: {page.dimension.unit}")
 
-        if hasattr(page, "blocks") and page.blocks:
-            print(f"  Text blocks: {len(page.blocks)}")
+        if page.blocks:
+            lines.append(f"  Text blocks: {len(page.blocks)}")
 
-        if hasattr(page, "paragraphs") and page.paragraphs:
-            print(f"  Paragraphs: {len(page.paragraphs)}")
+        if page.paragraphs:
+            lines.append(f"  Paragraphs: {len(page.paragraphs)}")
 
-        if hasattr(page, "lines") and page.lines:
-            print(f"  Lines: {len(page.lines)}")
+        if page.lines:
+            lines.append(f"  Lines: {len(page.lines)}")
 
-        if hasattr(page, "tokens") and page.tokens:
-            print(f"  Tokens: {len(page.tokens)}")
+        if page.tokens:
+            lines.append(f"  Tokens: {len(page.tokens)}")
+
+    print("\n".join(lines))
 
 
 def get_text_from_layout(layout, document_text: str) -> str:
@@ -181,35 +234,126 @@ def get_text_from_layout(layout, document_text: str) -> str:
     if not layout or not layout.text_anchor:
         return ""
 
-    text_segments = []
-    for segment in layout.text_anchor.text_segments:
-        start_index = int(segment.start_index) if segment.start_index else 0
-        end_index = int(segment.end_index) if segment.end_index else len(document_text)
-        text_segments.append(document_text[start_index:end_index])
+    # int64 offsets already arrive as Python ints; unset ones default to 0
+    segments = tuple(
+        (segment.start_index, segment.end_index)
+        for segment in layout.text_anchor.text_segments
+    )
+    return resolve_text_segments(segments, document_text)
+
 
-    return "".join(text_segments)
+@functools.lru_cache(maxsize=4096)
+def resolve_text_segments(segments, document_text: str) -> str:
+    """Join the document text covered by (start, end) offset pairs."""
+    return "".join(
+        document_text[start_index : end_index or len(document_text)]
+        for start_index, end_index in segments
+    )
 
 
 def save_full_output(document, output_file: str):
     """Save complete document structure to JSON file."""
-    # Convert document to dict format for JSON serialization
-    doc_dict = documentai.Document.to_dict(document)
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(doc_dict, f, indent=2, ensure_ascii=False)
+    # Serialize straight from the underlying protobuf message
+    json_output = json_format.MessageToJson(
+        documentai.Document.pb(document),
+        preserving_proto_field_name=True,
+        use_integers_for_enums=True,
+        indent=2,
+        ensure_ascii=False,
+    )
+
+    if output_file.endswith(".gz"):
+        # Repeated keys and indentation compress well; a low level keeps it fast
+        with gzip.open(output_file, "wt", encoding="utf-8", compresslevel=3) as f:
+            f.write(json_output)
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(json_output)
 
     print(f"\nFull document structure saved to: {output_file}")
 
 
-def process_invoice(file_path: str, save_json: bool = False):
+def save_full_output_pb(document, output_file: str):
+    """Save complete document structure to a binary protobuf file."""
+    with open(output_file, "wb") as f:
+        f.write(documentai.Document.serialize(document))
+
+    print(f"\nBinary document structure saved to: {output_file}")
+
+
+def load_saved_output(input_file: str):
+    """Load a document previously saved with save_full_output_pb."""
+    return documentai.Document.deserialize(read_file(input_file))
+
+
+def display_document(
+    document,
+    file_path: str,
+    save_json: bool = False,
+    save_pb: bool = False,
+    gzip_json: bool = False,
+    sections=DISPLAY_SECTIONS,
+):
+    """Display the requested sections and optionally save the output."""
+    # Materialize pages and text once for the sections that walk them
+    # Walk the raw protobuf pages; proto-plus wrappers cost a marshal per access
+    document_pb = documentai.Document.pb(document)
+    pages = (
+        list(document_pb.pages) if {"pages", "forms", "tables"} & set(sections) else []
+    )
+    document_text = document.text if {"forms", "tables", "text"} & set(sections) else ""
+
+    if "pages" in sections:
+        display_page_info(document, pages)
+    if "entities" in sections:
+        display_entities(document)
+    if "forms" in sections:
+        display_form_fields(document, pages, document_text)
+    if "tables" in sections:
+        display_tables(document, pages, document_text)
+    if "text" in sections:
+        display_raw_text(document, document_text)
+
+    # Save output if requested
+    output_base = os.path.splitext(file_path)[0].removesuffix("_docai_output")
+    if save_json:
+        json_suffix = ".json.gz" if gzip_json else ".json"
+        save_full_output(document, f"{output_base}_docai_output{json_suffix}")
+    if save_pb:
+        save_full_output_pb(document, f"{output_base}_docai_output.pb")
+
+
+def process_invoice(
+    file_path: str,
+    save_json: bool = False,
+    save_pb: bool = False,
+    gzip_json: bool = False,
+    sections=DISPLAY_SECTIONS,
+):
     """Process invoice and display comprehensive output."""
     try:
-        # Setup
-        client, processor_name = setup_client()
-
-        # Read file
-        with open(file_path, "rb") as file:
-            file_content = file.read()
+        if file_path.endswith(".pb"):
+            # Re-display a saved response without another Document AI call
+            print(f"Loading: {file_path}")
+            display_document(
+                load_saved_output(file_path),
+                file_path,
+                save_json,
+                gzip_json=gzip_json,
+                sections=sections,
+            )
+
+            print(f"\n{'='*60}")
+            print("PROCESSING COMPLETE")
+            print(f"{'='*60}")
+            return
+
+        # Setup the client while the file is read
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            client_future = executor.submit(setup_client)
+            content_future = executor.submit(read_file, file_path)
+            client, processor_name = client_future.result()
+            file_content = content_future.result()
 
         # Process document
         raw_document = documentai.RawDocument(
@@ -227,16 +371,7 @@ def process_invoice(file_path: str, save_json: bool = False):
         document = result.document
 
         # Display all information
-        display_page_info(document)
-        display_entities(document)
-        display_form_fields(document)
-        display_tables(document)
-        display_raw_text(document)
-
-        # Save JSON if requested
-        if save_json:
-            json_filename = f"{os.path.splitext(file_path)[0]}_docai_output.json"
-            save_full_output(document, json_filename)
+        display_document(document, file_path, save_json, save_pb, gzip_json, sections)
 
         print(f"\n{'='*60}")
         print("PROCESSING COMPLETE")
@@ -247,22 +382,233 @@ def process_invoice(file_path: str, save_json: bool = False):
         raise
 
 
-if __name__ == "__main__":
-    import sys
+def read_file(file_path: str) -> bytes:
+    """Read a PDF file into memory."""
+    # Unbuffered: FileIO.readall() sizes one bytes object from fstat
+    with open(file_path, "rb", buffering=0) as file:
+        return file.readall()
+
+
+async def process_invoice_async(
+    file_paths,
+    save_json: bool = False,
+    save_pb: bool = False,
+    gzip_json: bool = False,
+    sections=DISPLAY_SECTIONS,
+    concurrency: int = 4,
+):
+    """Process several invoices concurrently with the async Document AI client."""
+    processor_name = get_processor_name()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Back off exponentially when the processor quota is exhausted (HTTP 429)
+    retry = retry_async.AsyncRetry(
+        predicate=retry_async.if_exception_type(
+            exceptions.ResourceExhausted, exceptions.ServiceUnavailable
+        ),
+        initial=1.0,
+        maximum=32.0,
+        multiplier=2.0,
+        timeout=300.0,
+    )
+
+    async def process_one(file_path):
+        async with semaphore:
+            file_content = await asyncio.to_thread(read_file, file_path)
+            request = documentai.ProcessRequest(
+                name=processor_name,
+                raw_document=documentai.RawDocument(
+                    content=file_content, mime_type="application/pdf"
+                ),
+            )
+            result = await client.process_document(request=request, retry=retry)
+            return result.document
+
+    print(f"Processing {len(file_paths)} files (concurrency {concurrency})")
+    print(f"Processor: {processor_name}")
+
+    # Close the client's gRPC channel once every request has finished
+    async with documentai.DocumentProcessorServiceAsyncClient() as client:
+        documents = await asyncio.gather(
+            *(process_one(file_path) for file_path in file_paths),
+            return_exceptions=True,
+        )
+
+    for file_path, document in zip(file_paths, documents):
+        print(f"\nProcessing: {file_path}")
+        if isinstance(document, Exception):
+            print(f"Error processing document: {document}")
+            continue
+        display_document(document, file_path, save_json, save_pb, gzip_json, sections)
+
+    print(f"\n{'='*60}")
+    print("PROCESSING COMPLETE")
+    print(f"{'='*60}")
+
+
+def batch_process_invoices(
+    file_paths,
+    save_json: bool = False,
+    save_pb: bool = False,
+    gzip_json: bool = False,
+    sections=DISPLAY_SECTIONS,
+    timeout: int = 900,
+):
+    """Process several invoices in one batch request staged through Cloud Storage."""
+    from google.cloud import storage
+
+    bucket_name = os.getenv("DOCUMENT_AI_GCS_BUCKET")
+    if not bucket_name:
+        raise ValueError(
+            "Missing required environment variable for batch processing: "
+            "DOCUMENT_AI_GCS_BUCKET"
+        )
+
+    client, processor_name = setup_client()
+    storage_client = storage.Client()
+    bucket = storage_client.bucket(bucket_name)
+    prefix = f"document_ai_explorer/{uuid.uuid4().hex}"
+
+    try:
+        # Stage inputs in GCS
+        gcs_documents = []
+        source_paths = {}
+        for i, file_path in enumerate(file_paths):
+            blob = bucket.blob(f"{prefix}/input/{i}_{os.path.basename(file_path)}")
+            blob.upload_from_filename(file_path, content_type="application/pdf")
+            gcs_uri = f"gs://{bucket_name}/{blob.name}"
+            gcs_documents.append(
+                documentai.GcsDocument(gcs_uri=gcs_uri, mime_type="application/pdf")
+            )
+            source_paths[gcs_uri] = file_path
+
+        request = documentai.BatchProcessRequest(
+            name=processor_name,
+            input_documents=documentai.BatchDocumentsInputConfig(
+                gcs_documents=documentai.GcsDocuments(documents=gcs_documents)
+            ),
+            document_output_config=documentai.DocumentOutputConfig(
+                gcs_output_config=documentai.DocumentOutputConfig.GcsOutputConfig(
+                    gcs_uri=f"gs://{bucket_name}/{prefix}/output/"
+                )
+            ),
+        )
+
+        print(f"Batch processing {len(file_paths)} files")
+        print(f"Processor: {processor_name}")
+
+        operation = client.batch_process_documents(request=request)
+        operation.result(timeout=timeout)
+
+        # Each input maps to a GCS output folder holding one or more JSON shards
+        for status in operation.metadata.individual_process_statuses:
+            file_path = source_paths.get(
+                status.input_gcs_source, status.input_gcs_source
+            )
+            print(f"\nProcessing: {file_path}")
+
+            if status.status.code:
+                print(f"Error processing document: {status.status.message}")
+                continue
+
+            output_prefix = status.output_gcs_destination.split("/", 3)[3]
+            shards = [
+                blob
+                for blob in storage_client.list_blobs(bucket_name, prefix=output_prefix)
+                if blob.name.endswith(".json")
+            ]
+            root, ext = os.path.splitext(file_path)
+            for shard_index, blob in enumerate(shards):
+                document = documentai.Document.from_json(
+                    blob.download_as_bytes(), ignore_unknown_fields=True
+                )
+                # Give each shard of a split document its own saved output
+                shard_path = (
+                    f"{root}_shard{shard_index}{ext}" if len(shards) > 1 else file_path
+                )
+                display_document(
+                    document, shard_path, save_json, save_pb, gzip_json, sections
+                )
+
+        print(f"\n{'='*60}")
+        print("PROCESSING COMPLETE")
+        print(f"{'='*60}")
 
-    if len(sys.argv) < 2:
-        print("Usage: python document_ai_explorer.py <pdf_file_path> [--save-json]")
-        print("\nEnvironment variables required:")
-        print("  GOOGLE_CLOUD_PROJECT_ID")
-        print("  DOCUMENT_AI_PROCESSOR_ID")
-        print("  GOOGLE_CLOUD_LOCATION (optional, defaults to 'us')")
-        sys.exit(1)
+    except Exception as e:
+        print(f"Error processing documents: {e}")
+        raise
 
-    pdf_path = sys.argv[1]
-    save_json = "--save-json" in sys.argv
+    finally:
+        # Remove staged inputs and outputs
+        for blob in storage_client.list_blobs(bucket_name, prefix=prefix):
+            blob.delete()
 
-    if not os.path.exists(pdf_path):
-        print(f"Error: File not found: {pdf_path}")
-        sys.exit(1)
 
-    process_invoice(pdf_path, save_json)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Display everything Document AI extracts from PDF invoices.",
+        epilog=(
+            "Environment variables required: GOOGLE_CLOUD_PROJECT_ID, "
+            "DOCUMENT_AI_PROCESSOR_ID, GOOGLE_CLOUD_LOCATION (optional, defaults "
+            "to 'us'), DOCUMENT_AI_GCS_BUCKET (optional, enables batch processing "
+            "of multiple files)"
+        ),
+    )
+    parser.add_argument("pdf_paths", nargs="+", metavar="pdf_file_path")
+    parser.add_argument("--save-json", action="store_true")
+    parser.add_argument(
+        "--save-pb",
+        action="store_true",
+        help="also save the response as binary protobuf (reload by passing the .pb)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="gzip the --save-json output (<name>_docai_output.json.gz)",
+    )
+    parser.add_argument(
+        "--only",
+        default=",".join(DISPLAY_SECTIONS),
+        help=(
+            "comma-separated sections to display: "
+            f"{', '.join(DISPLAY_SECTIONS)} (add 'json' to imply --save-json)"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="maximum in-flight requests when processing multiple files",
+    )
+    args = parser.parse_args()
+
+    requested = {s for s in (x.strip() for x in args.only.split(",")) if s}
+    unknown = requested - set(DISPLAY_SECTIONS) - {"json"}
+    if unknown:
+        parser.error(f"unknown --only section(s): {', '.join(sorted(unknown))}")
+    sections = tuple(s for s in DISPLAY_SECTIONS if s in requested)
+    save_json = args.save_json or "json" in requested
+
+    for pdf_path in args.pdf_paths:
+        if not os.path.exists(pdf_path):
+            print(f"Error: File not found: {pdf_path}")
+            sys.exit(1)
+
+    if len(args.pdf_paths) == 1 or any(p.endswith(".pb") for p in args.pdf_paths):
+        for pdf_path in args.pdf_paths:
+            process_invoice(pdf_path, save_json, args.save_pb, args.gzip, sections)
+    elif os.getenv("DOCUMENT_AI_GCS_BUCKET"):
+        batch_process_invoices(
+            args.pdf_paths, save_json, args.save_pb, args.gzip, sections
+        )
+    else:
+        asyncio.run(
+            process_invoice_async(
+                args.pdf_paths,
+                save_json,
+                args.save_pb,
+                args.gzip,
+                sections,
+                args.concurrency,
+            )
+        )
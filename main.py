@@ -1,15 +1,352 @@
+import bisect
+import calendar
+import functools
+import itertools
+import json
+import logging
 import os
 import re
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import NamedTuple
 
 import functions_framework
 import google.generativeai as genai
+import google_auth_httplib2
+import httplib2
+import orjson
 import requests
-from flask import Request, jsonify
+import urllib3
+from flask import Request, Response
 from google.auth import default
 from google.cloud import documentai_v1 as documentai
 from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Shared HTTP adapter so warm instances reuse pooled keep-alive connections
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+)
+
+# Background worker for setup calls that can overlap the extraction round-trips
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# API clients are created lazily once per instance and reused by warm invocations
+_CLIENT_LOCK = threading.Lock()
+_CREDENTIALS = None
+_DOCAI_CLIENT = None
+_SHEETS_SERVICE = None
+
+# Browser-like headers for Trello attachment downloads
+_TRELLO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/pdf,application/octet-stream,*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Referer": "https://trello.com/",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "same-origin",
+}
+
+# Regex patterns used by the extraction helpers, compiled once at import time
+_ORDER_NUMBER_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"Order\s*#\s*([A-Z0-9]+)",
+        r"Order\s*Number\s*:?\s*([A-Z0-9]+)",
+        r"Order\s*ID\s*:?\s*([A-Z0-9]+)",
+    )
+)
+# Priority order for extract_order_number_improved, plus all three as one scan
+_IMPROVED_ORDER_NUMBER_SOURCES = (
+    r"(NS\d+)",
+    r"PO #\s*([A-Z]+\d+)",
+    r"Order #\s*([A-Z]+\d+)",
+)
+_IMPROVED_ORDER_NUMBER_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE) for p in _IMPROVED_ORDER_NUMBER_SOURCES
+)
+_IMPROVED_ORDER_NUMBER_RE = re.compile(
+    "|".join(_IMPROVED_ORDER_NUMBER_SOURCES), re.IGNORECASE
+)
+_DISCOUNT_RE = re.compile(r"Discount:\s*(\d+(?:\.\d+)?)%\s*OFF", re.IGNORECASE)
+_ORDER_DATE_IMPROVED_RE = re.compile(
+    r"Order Date:\s*((?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4}))",
+    re.IGNORECASE,
+)
+_LONG_DATE = r"((?P<month>[A-Za-z]+) (?P<day>\d{1,2}), (?P<year>\d{4}))"
+_ORDER_DATE_PATTERNS = tuple(
+    re.compile(p + _LONG_DATE, re.IGNORECASE)
+    for p in (
+        r"placed\s+on\s+",
+        r"Order\s+Date\s*:?\s*",
+        r"Date\s*:?\s*",
+    )
+)
+_MONTH_NUMBERS = {
+    name.lower(): number for number, name in enumerate(calendar.month_name) if name
+}
+_ISO_DATE_RE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+_PRICE_STRIP_RE = re.compile(r"[^0-9.-]")
+# Same filter as _PRICE_STRIP_RE, as a deletion table for ASCII input
+_PRICE_STRIP_TABLE = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if chr(c) not in "0123456789.-")
+)
+_INVOICE_RE = re.compile(r"Invoice\s*#\s*(\d+)", re.IGNORECASE)
+_ISBN_RE = re.compile(r"\b(978\d{10})\b")
+_PRODUCT_CODE_RE = re.compile(
+    r"(?P<number_letter>\b\d{3}\s+[A-Z]{2,4}\b)"  # "006 AR", "008 TIN"
+    r"|(?P<short_code>\b[A-Z]{2,4}\d{2,8}[A-Z]?\b)"  # "DF8011", "DG0110A"
+)
+_PRICE_RE = re.compile(r"\b(\d+\.\d{2})\b")
+_CC_QTY_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\b(\d+)\s+\d+\s+lo\s+each\b",  # "8 0 lo each" - very specific
+        r"\b(\d+)\s+\d+\s+Set\b",  # "6 0 Set" - specific for Set
+        r"\b(\d+)\s+\d+\s+each\b",  # "24 0 each" - general each
+    )
+)
+_CREATIVE_COOP_CODE_RE = re.compile(r"\b(D[A-Z]\d{4}[A-Z]?)\b")
+_RIFLE_CODE_RE = re.compile(r"\b([A-Z0-9]{3,10})\s+\d{12}\s+\$?\d+\.\d{2}")
+_MIN_RIFLE_CODE_LENGTH = len("ABC 123456789012 1.00")
+_QUANTITY_VALUE_RE = re.compile(r"\b(\d+(?:\.\d+)?)\b")
+_CS_NUMBER_RE = re.compile(r"CS(\d+)")
+_CC_ORDER_DATE_RE = re.compile(r"ORDER DATE:\s*(\d{1,2}/\d{1,2}/\d{4})")
+_TEXT_PRODUCT_CODE_RE = re.compile(r"^[A-Z]{2,}\d+", re.MULTILINE)
+_PRICE_ONLY_RE = re.compile(r"^\d+\.\d{2}$")
+_NUMBERS_ONLY_RE = re.compile(r"^\d+[\d\s\.]*$")
+_UPC_CODE_RE = re.compile(r"\b(\d{12,13})\b")
+_UPC_RE = re.compile(r"\b\d{12,13}\b")
+_DIGIT_RE = re.compile(r"\d")
+_DECIMAL_PRICE_RE = re.compile(r"\b\d+\.\d{2}\b")
+_QTY_EACH_RE = re.compile(r"\b\d+\s+\d+\s+(?:lo\s+)?each\b", re.IGNORECASE)
+_QTY_SET_RE = re.compile(r"\b\d+\s+\d+\s+Set\b", re.IGNORECASE)
+_DESC_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(S/\d+\s+.{10,})",  # Sets like 'S/3 11-3/4" Rnd...' - CHECK FIRST
+        r'(\d+(?:["\'-]\d+)*["\']?[LWH][^0-9\n]{10,})',  # '3-1/4"L x 4"H...'
+        r"([A-Z][^0-9\n]{15,})",  # Text starting with capital, at least 15 chars
+        r'"([^"]+)"',  # Quoted text
+    )
+)
+_FULL_TEXT_DESC_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r'(\d+["\'-]\d+["\']?[LWH]?\s+[^\d\n]{15,})',  # '3-1/4" Rnd x 4"H 12 oz...'
+        r"(S/\d+\s+[^\d\n]{10,})",  # 'S/3 11-3/4" Rnd x...'
+        r"([A-Z][a-z]+[^\d\n]{15,})",  # "Stoneware Berry Basket..."
+    )
+)
+_RIFLE_DATA_LINE_RE = re.compile(r"\b[A-Z0-9]{3,10}\s+\d{12}\s+\d+\.\d{2}")
+_RIFLE_PRODUCT_RE = re.compile(
+    r"\b(?P<code>[A-Z0-9]{3,10})\s+(?P<upc>\d{12})"
+    r"\s+(?P<price>\d+\.\d{2})\s+(?P<qty>\d+)\s+(?P<total>\d+\.\d{2})"
+)
+_TWELVE_DIGITS_RE = re.compile(r"\d{12}")
+_TWELVE_DIGIT_UPC_RE = re.compile(r"\b(\d{12})\b")
+_ASCII_TWELVE_DIGIT_UPC_RE = re.compile(r"\b(\d{12})\b", re.ASCII)
+_INTEGER_RE = re.compile(r"\b(\d+)\b")
+_NUMERIC_DASH_LINE_RE = re.compile(r"^[\d\s\.\-]+$")
+_CC_PRODUCT_UPC_RE = re.compile(r"\b(D[A-Z]\d{4}[A-Z]?)\s+(\d{12})")
+_CC_SAME_LINE_DESC_RE = re.compile(
+    r"^\s*(.+?)(?:\s+\d+\s+\d+\s+(?:each|lo|Set)|\s+TRF)"
+)
+_CC_BEFORE_DESC_PATTERNS = tuple(
+    re.compile(p)
+    for p in (
+        r"([^\n]{15,})\s*$",  # Last line before product code
+        r'(\d+["\'-]\d+["\']?[LWH]?\s+[^\n]{10,})',  # Dimension descriptions
+        r"(S/\d+\s+[^\n]{10,})",  # Set descriptions
+    )
+)
+_CC_NUMBER_RE = re.compile(r"\b\d+(?:\.\d{1,2})?\b")
+# "ordered back unit unit_price wholesale amount"
+_CC_PRICE_PATTERN1 = re.compile(
+    r"(\d+)\s+(\d+)\s+(?:lo\s+)?(?:each|Set)"
+    r"\s+(\d+\.\d{2})\s+(\d+\.\d{2})\s+(\d+\.\d{2})",
+    re.IGNORECASE,
+)
+# "qty back unit unit_price ... wholesale amount"
+_CC_PRICE_PATTERN2 = re.compile(
+    r"(\d+)\s+(\d+)\s+(?:lo\s+)?(?:each|Set)"
+    r"\s+(\d+\.\d{2}).*?(\d+\.\d{2})\s+(\d+\.\d{2})",
+    re.IGNORECASE,
+)
+_PIPE_TO_NEWLINE = str.maketrans("|", "\n")
+# Creative-Coop table header words that are never descriptions on their own
+_TABLE_HEADER_WORDS = frozenset(
+    {
+        "customer",
+        "item",
+        "shipped",
+        "back",
+        "ordered",
+        "um",
+        "list",
+        "price",
+        "truck",
+        "your",
+        "extended",
+        "amount",
+    }
+)
+# Words that mark a Creative-Coop line as a product description
+_DESCRIPTION_KEYWORD_RE = re.compile("cotton|stoneware|frame|pillow|glass|wood|resin")
+_DESC_CODE_RE = re.compile(r"#([A-Z0-9]+)")
+# Priority order for the OneHundred80 order date, plus all three as one scan
+_O180_DATE_SOURCES = (
+    r"Order Date[:\s]+(\d{1,2}/\d{1,2}/\d{4})",
+    r"Date[:\s]+(\d{1,2}/\d{1,2}/\d{4})",
+    r"(\d{1,2}/\d{1,2}/\d{4})",
+)
+_O180_DATE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in _O180_DATE_SOURCES)
+_O180_DATE_RE = re.compile("|".join(_O180_DATE_SOURCES), re.IGNORECASE)
+_DIMENSION_RUN_RE = re.compile(r'(\d)(\d+)(\d)"')
+_DIMENSION_PAIR_RE = re.compile(r'(\d+\.?\d*)"?\s+(\d+\.?\d*)"')
+_TABLE_HEADER_RE = re.compile(r"(Unit Price|Extended|Price|SKU|UPC|QTY)", re.IGNORECASE)
+_TABLE_HEADER_WORD_RE = re.compile(
+    r"\b(?:Unit Price|Extended|Price|SKU|UPC|QTY|Order Items|Total Pieces)\b",
+    re.IGNORECASE,
+)
+_DOUBLE_COMMA_RE = re.compile(r",\s*,")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PRICE_CHARS_LINE_RE = re.compile(r"^[\d\s\.\$]+$")
+_TWELVE_DIGIT_LINE_RE = re.compile(r"^\d{12}$")
+_TRAILING_PRICE_RE = re.compile(r"\s+\d+\.\d{2}$")
+_TRAILING_NUMBER_RE = re.compile(r"\s+\d+$")
+
+# Priority order of vendor-related entity types (lower value = higher priority)
+_VENDOR_FIELD_PRIORITY = {
+    field: priority
+    for priority, field in enumerate(
+        ["remit_to_name", "supplier_name", "vendor_name", "bill_from_name"]
+    )
+}
+
+# Product codes of line items that are not real products
+_SHIPPING_CODES = frozenset({"SHIP", "SHIPPING"})
+_OUT_OF_STOCK_CODES = frozenset({"NOT IN STOCK", "OOS", "OUT OF STOCK"})
+
+# Lowercased vendor indicators, checked in priority order by detect_vendor_type.
+# Indicators containing another indicator of the same vendor (such as
+# "mfr: harpercollins") can never decide the result and are left out.
+_VENDOR_INDICATORS = (
+    (
+        "HarperCollins",
+        (
+            "harpercollins",
+            "harper collins",
+            "anne mcgilvray & company",  # Distributor for HarperCollins
+        ),
+    ),
+    (
+        "Creative-Coop",
+        ("creative co-op", "creativeco-op", "creative coop"),
+    ),
+    (
+        "OneHundred80",
+        (
+            "one hundred 80 degrees",
+            "onehundred80",
+            "one hundred80",
+        ),
+    ),
+)
+
+
+def json_response(payload):
+    """Serialize a response payload with orjson"""
+    try:
+        body = orjson.dumps(payload)
+    except orjson.JSONEncodeError:
+        # orjson rejects strings that are not valid UTF-8 (e.g. lone surrogates)
+        body = json.dumps(payload)
+    return Response(body, mimetype="application/json")
+
+
+def new_http_session():
+    """Return a per-request session that uses the shared connection pool
+
+    Cookies stay scoped to the one request. Do not close the session, since
+    that would also close the shared adapter's pool.
+    """
+    session = requests.Session()
+    session.mount("https://", _HTTP_ADAPTER)
+    session.mount("http://", _HTTP_ADAPTER)
+    return session
+
+
+def get_credentials():
+    """Return the cached application default credentials"""
+    global _CREDENTIALS
+    if _CREDENTIALS is None:
+        with _CLIENT_LOCK:
+            if _CREDENTIALS is None:
+                _CREDENTIALS, _ = default()
+    return _CREDENTIALS
+
+
+def get_documentai_client():
+    """Return the cached Document AI client"""
+    global _DOCAI_CLIENT
+    if _DOCAI_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _DOCAI_CLIENT is None:
+                _DOCAI_CLIENT = documentai.DocumentProcessorServiceClient()
+    return _DOCAI_CLIENT
+
+
+def get_sheets_service():
+    """Return the cached Google Sheets API client
+
+    Its own httplib2 transport is not thread-safe, so requests made through it
+    must pass a per-call transport from sheets_http().
+    """
+    global _SHEETS_SERVICE
+    if _SHEETS_SERVICE is None:
+        credentials = get_credentials()
+        with _CLIENT_LOCK:
+            if _SHEETS_SERVICE is None:
+                _SHEETS_SERVICE = build(
+                    "sheets",
+                    "v4",
+                    credentials=credentials,
+                    cache_discovery=False,
+                    static_discovery=True,
+                )
+    return _SHEETS_SERVICE
+
+
+def sheets_http():
+    """Return a fresh authorized transport for one Sheets API call"""
+    return google_auth_httplib2.AuthorizedHttp(get_credentials(), http=httplib2.Http())
+
+
+def write_to_sheet(service, spreadsheet_id, sheet_name, rows):
+    """Append all extracted rows to the sheet in a single API request"""
+    return (
+        service.spreadsheets()
+        .values()
+        .append(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{sheet_name}'!A:G",
+            valueInputOption="USER_ENTERED",
+            insertDataOption="INSERT_ROWS",
+            body={"values": rows},
+        )
+        .execute(http=sheets_http())
+    )
 
 
 def process_with_gemini_first(pdf_content):
@@ -143,7 +480,7 @@ Extract from this invoice:"""
 def process_invoice(request: Request):
     # Check request method
     if request.method != "POST":
-        return jsonify({"error": "Method Not Allowed"}), 405
+        return json_response({"error": "Method Not Allowed"}), 405
 
     # Step 1: Handle file upload from Zapier form POST
     if request.files and "invoice_file" in request.files:
@@ -152,13 +489,13 @@ def process_invoice(request: Request):
         filename = file.filename
 
         if not filename:
-            return jsonify({"error": "No filename provided"}), 400
+            return json_response({"error": "No filename provided"}), 400
 
         # Read file content directly from memory
         pdf_content = file.read()
 
         if not pdf_content:
-            return jsonify({"error": "Empty file received"}), 400
+            return json_response({"error": "Empty file received"}), 400
 
         print(f"Received file upload: {filename}")
 
@@ -176,122 +513,144 @@ def process_invoice(request: Request):
             file_url = request_json.get("file_url") if request_json else None
 
         if not file_url:
-            return jsonify({"error": "Missing invoice_file or file_url"}), 400
+            return json_response({"error": "Missing invoice_file or file_url"}), 400
 
         # Step 2: Download the PDF from URL
+        session = new_http_session()
         try:
             # Special handling for Trello URLs
             if "trello.com" in file_url:
                 # Try multiple authentication strategies for Trello
-                session = requests.Session()
-
                 # Strategy 1: Use cookies and referrer
-                session.headers.update(
-                    {
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                        "Accept": "application/pdf,application/octet-stream,*/*",
-                        "Accept-Language": "en-US,en;q=0.9",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "Connection": "keep-alive",
-                        "Upgrade-Insecure-Requests": "1",
-                        "Referer": "https://trello.com/",
-                        "Sec-Fetch-Dest": "document",
-                        "Sec-Fetch-Mode": "navigate",
-                        "Sec-Fetch-Site": "same-origin",
-                    }
-                )
 
                 # First, try to get the main Trello page to establish session
                 try:
                     card_id = file_url.split("/cards/")[1].split("/")[0]
                     card_url = f"https://trello.com/c/{card_id}"
-                    session.get(card_url, timeout=10)
+                    session.get(card_url, headers=_TRELLO_HEADERS, timeout=10)
                 except:
                     pass  # Continue even if this fails
 
                 # Try the direct download
-                response = session.get(file_url, allow_redirects=True, timeout=30)
+                response = session.get(
+                    file_url,
+                    headers=_TRELLO_HEADERS,
+                    allow_redirects=True,
+                    stream=True,
+                    timeout=30,
+                )
 
                 # If 401, try removing the /download/filename part
                 if response.status_code == 401:
+                    response.close()
                     base_attachment_url = file_url.split("/download/")[0]
                     response = session.get(
-                        base_attachment_url, allow_redirects=True, timeout=30
+                        base_attachment_url,
+                        headers=_TRELLO_HEADERS,
+                        allow_redirects=True,
+                        stream=True,
+                        timeout=30,
                     )
 
                 # If still 401, try with different headers
                 if response.status_code == 401:
-                    session.headers.update(
-                        {
+                    response.close()
+                    response = session.get(
+                        file_url,
+                        headers={
+                            **_TRELLO_HEADERS,
                             "Authorization": "",  # Remove any auth headers
                             "Cookie": "",  # Clear cookies
-                        }
+                        },
+                        allow_redirects=True,
+                        stream=True,
+                        timeout=30,
                     )
-                    response = session.get(file_url, allow_redirects=True, timeout=30)
 
             else:
                 # Regular download for other URLs
-                response = requests.get(file_url, timeout=30)
+                response = session.get(file_url, stream=True, timeout=30)
+
+            # Closing the streamed response on every exit returns its
+            # connection to the pool
+            with response:
+                response.raise_for_status()
+
+                # Verify we got a PDF before downloading the body
+                content_type = response.headers.get("content-type", "").lower()
+                pdf_header = b""
+                if "pdf" not in content_type:
+                    if not file_url.lower().endswith(".pdf"):
+                        return (
+                            json_response({"error": "Downloaded file is not a PDF"}),
+                            400,
+                        )
 
-            response.raise_for_status()
+                    # Only the URL says this is a PDF (e.g. an HTML error page
+                    # served at a .pdf link), so check for the PDF header in the
+                    # first bytes
+                    pdf_header = response.raw.read(1024, decode_content=True)
+                    if b"%PDF" not in pdf_header:
+                        return (
+                            json_response({"error": "Downloaded file is not a PDF"}),
+                            400,
+                        )
 
-            # Verify we got a PDF
-            content_type = response.headers.get("content-type", "").lower()
-            if "pdf" not in content_type and not file_url.lower().endswith(".pdf"):
-                return jsonify({"error": "Downloaded file is not a PDF"}), 400
+                # Read the body straight off the socket in one call rather than
+                # letting requests accumulate and join chunks
+                pdf_content = pdf_header + response.raw.read(decode_content=True)
 
-        except requests.exceptions.RequestException as e:
+        except (
+            requests.exceptions.RequestException,
+            urllib3.exceptions.HTTPError,
+        ) as e:
             # If download fails, return a more helpful error with suggestion
             error_msg = f"Failed to download PDF: {str(e)}"
             if "401" in str(e) and "trello.com" in file_url:
                 error_msg += ". Trello attachment may require board access permissions. Consider using a public file sharing service instead."
-            return jsonify({"error": error_msg}), 500
+            return json_response({"error": error_msg}), 500
 
-        pdf_content = response.content
         print(f"Downloaded PDF from URL: {file_url}")
 
+    # Authenticate and build the Sheets client while Gemini/Document AI run
+    sheets_service = _EXECUTOR.submit(get_sheets_service)
+
     # NEW: Try Gemini AI first
     print("🚀 Starting multi-tier processing: Gemini → Document AI → Fallbacks")
     gemini_result = process_with_gemini_first(pdf_content)
 
     if gemini_result:
         rows, invoice_date, vendor, invoice_number = gemini_result
-        
+
         print(f"✅ Gemini processing successful: {len(rows)} items")
-        
+
         # Write to Google Sheets
         try:
             spreadsheet_id = os.environ.get("GOOGLE_SHEETS_SPREADSHEET_ID")
             sheet_name = os.environ.get("GOOGLE_SHEETS_SHEET_NAME", "Sheet1")
-            
-            credentials, _ = default()
-            service = build("sheets", "v4", credentials=credentials)
-            sheet = service.spreadsheets()
-
-            result = (
-                sheet.values()
-                .append(
-                    spreadsheetId=spreadsheet_id,
-                    range=f"'{sheet_name}'!A:G",
-                    valueInputOption="USER_ENTERED",
-                    insertDataOption="INSERT_ROWS",
-                    body={"values": rows},
-                )
-                .execute()
-            )
 
-            return jsonify({
-                "message": "Invoice processed successfully with Gemini AI",
-                "rows_added": len(rows),
-                "vendor": vendor,
-                "invoice_number": invoice_number,
-                "invoice_date": invoice_date,
-                "processing_method": "Gemini AI"
-            }), 200
+            write_to_sheet(sheets_service.result(), spreadsheet_id, sheet_name, rows)
+
+            return (
+                json_response(
+                    {
+                        "message": "Invoice processed successfully with Gemini AI",
+                        "rows_added": len(rows),
+                        "vendor": vendor,
+                        "invoice_number": invoice_number,
+                        "invoice_date": invoice_date,
+                        "processing_method": "Gemini AI",
+                    }
+                ),
+                200,
+            )
 
         except Exception as e:
             print(f"❌ Sheets writing failed: {e}")
-            return jsonify({"error": f"Failed to write to Google Sheets: {str(e)}"}), 500
+            return (
+                json_response({"error": f"Failed to write to Google Sheets: {str(e)}"}),
+                500,
+            )
 
     # EXISTING: Fallback to Document AI processing if Gemini failed
     print("⬇️ Gemini processing failed or found no items, falling back to Document AI...")
@@ -305,7 +664,7 @@ def process_invoice(request: Request):
 
     if not project_id or not processor_id or not spreadsheet_id:
         return (
-            jsonify(
+            json_response(
                 {
                     "error": "Missing required environment variables: GOOGLE_CLOUD_PROJECT_ID, DOCUMENT_AI_PROCESSOR_ID, GOOGLE_SHEETS_SPREADSHEET_ID"
                 }
@@ -313,7 +672,7 @@ def process_invoice(request: Request):
             500,
         )
 
-    client = documentai.DocumentProcessorServiceClient()
+    client = get_documentai_client()
     name = f"projects/{project_id}/locations/{location}/processors/{processor_id}"
 
     # Step 4: Prepare document and send to Document AI
@@ -325,11 +684,13 @@ def process_invoice(request: Request):
     try:
         result = client.process_document(request=request)
     except Exception as e:
-        return jsonify({"error": f"Document AI processing failed: {str(e)}"}), 500
+        return json_response({"error": f"Document AI processing failed: {str(e)}"}), 500
 
     # Step 5: Extract key fields from Document AI response
     document = result.document
-    entities = {e.type_: e.mention_text for e in document.entities}
+    document_text = document.text
+    document_entities = document.entities
+    entities = {e.type_: e.mention_text for e in document_entities}
 
     # Debug: Log all detected entities
     print(f"Document AI detected entities: {entities}")
@@ -340,15 +701,15 @@ def process_invoice(request: Request):
     invoice_date = ""
 
     # Detect vendor type and use appropriate processing
-    vendor_type = detect_vendor_type(document.text)
+    vendor_type = detect_vendor_type(document_text)
     print(f"Detected vendor type: {vendor_type}")
 
     if vendor_type == "HarperCollins":
         # Use specialized HarperCollins processing
         rows = process_harpercollins_document(document)
         vendor = "HarperCollins"
-        invoice_number = extract_order_number_improved(document.text) or "Unknown"
-        invoice_date = extract_order_date_improved(document.text) or "Unknown"
+        invoice_number = extract_order_number_improved(document_text) or "Unknown"
+        invoice_date = extract_order_date_improved(document_text) or "Unknown"
         print(f"HarperCollins processing returned {len(rows)} rows")
 
         # Fallback to generic processing if specialized processing returns no results
@@ -356,24 +717,9 @@ def process_invoice(request: Request):
             print(
                 "HarperCollins specialized processing found no items, falling back to generic processing..."
             )
-            rows = extract_line_items_from_entities(
-                document, invoice_date, vendor, invoice_number
+            rows = extract_line_items_with_fallbacks(
+                document, document_text, invoice_date, vendor, invoice_number
             )
-            print(f"Generic entity extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to table extraction...")
-                rows = extract_line_items(
-                    document, invoice_date, vendor, invoice_number
-                )
-                print(f"Table extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to text extraction...")
-                rows = extract_line_items_from_text(
-                    document.text, invoice_date, vendor, invoice_number
-                )
-                print(f"Text extraction returned {len(rows)} rows")
     elif vendor_type == "Creative-Coop":
         # Use specialized Creative-Coop processing
         rows = process_creative_coop_document(document)
@@ -381,7 +727,7 @@ def process_invoice(request: Request):
         invoice_number = entities.get("invoice_id") or "Unknown"
         invoice_date = (
             format_date(entities.get("invoice_date"))
-            or extract_order_date(document.text)
+            or extract_order_date(document_text)
             or "Unknown"
         )
         print(f"Creative-Coop processing returned {len(rows)} rows")
@@ -393,47 +739,28 @@ def process_invoice(request: Request):
             )
 
             # Re-extract invoice details for fallback processing
-            import re
-
-            cs_matches = re.findall(r"CS(\d+)", document.text)
-            if cs_matches:
-                invoice_number = f"CS{cs_matches[0]}"
+            cs_match = _CS_NUMBER_RE.search(document_text)
+            if cs_match:
+                invoice_number = f"CS{cs_match.group(1)}"
 
-            date_matches = re.findall(
-                r"ORDER DATE:\s*(\d{1,2}/\d{1,2}/\d{4})", document.text
-            )
-            if date_matches:
-                invoice_date = date_matches[0]
+            date_match = _CC_ORDER_DATE_RE.search(document_text)
+            if date_match:
+                invoice_date = date_match.group(1)
 
             print(
                 f"Using fallback details: Invoice={invoice_number}, Date={invoice_date}"
             )
 
-            rows = extract_line_items_from_entities(
-                document, invoice_date, vendor, invoice_number
+            rows = extract_line_items_with_fallbacks(
+                document, document_text, invoice_date, vendor, invoice_number
             )
-            print(f"Generic entity extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to table extraction...")
-                rows = extract_line_items(
-                    document, invoice_date, vendor, invoice_number
-                )
-                print(f"Table extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to text extraction...")
-                rows = extract_line_items_from_text(
-                    document.text, invoice_date, vendor, invoice_number
-                )
-                print(f"Text extraction returned {len(rows)} rows")
     elif vendor_type == "OneHundred80":
         # Use specialized OneHundred80 processing
         rows = process_onehundred80_document(document)
         vendor = "OneHundred80"
         # OneHundred80 uses purchase order number as invoice number
-        invoice_number = extract_order_number(document.text) or "Unknown"
-        invoice_date = extract_order_date(document.text) or "Unknown"
+        invoice_number = extract_order_number(document_text) or "Unknown"
+        invoice_date = extract_order_date(document_text) or "Unknown"
         print(f"OneHundred80 processing returned {len(rows)} rows")
 
         # Fallback to generic processing if specialized processing returns no results
@@ -441,89 +768,51 @@ def process_invoice(request: Request):
             print(
                 "OneHundred80 specialized processing found no items, falling back to generic processing..."
             )
-            rows = extract_line_items_from_entities(
-                document, invoice_date, vendor, invoice_number
+            rows = extract_line_items_with_fallbacks(
+                document, document_text, invoice_date, vendor, invoice_number
             )
-            print(f"Generic entity extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to table extraction...")
-                rows = extract_line_items(
-                    document, invoice_date, vendor, invoice_number
-                )
-                print(f"Table extraction returned {len(rows)} rows")
-
-            if not rows:
-                print("Falling back to text extraction...")
-                rows = extract_line_items_from_text(
-                    document.text, invoice_date, vendor, invoice_number
-                )
-                print(f"Text extraction returned {len(rows)} rows")
     else:
         # Use generic processing for other vendors
-        vendor = extract_best_vendor(document.entities)
+        vendor = extract_best_vendor(document_entities)
         invoice_number = entities.get("invoice_id", "")
         invoice_date = format_date(entities.get("invoice_date", ""))
 
         # Fallback extraction for missing invoice number (look for order number)
         if not invoice_number:
-            invoice_number = extract_order_number(document.text)
+            invoice_number = extract_order_number(document_text)
 
         # Fallback extraction for missing invoice date (look for order date)
         if not invoice_date:
-            invoice_date = extract_order_date(document.text)
+            invoice_date = extract_order_date(document_text)
 
         print(
             f"Generic processing - Vendor: '{vendor}', Invoice#: '{invoice_number}', Date: '{invoice_date}'"
         )
 
-        # Extract line items from Document AI entities first
-        rows = extract_line_items_from_entities(
-            document, invoice_date, vendor, invoice_number
+        # Extract line items from Document AI entities first, then fall back
+        rows = extract_line_items_with_fallbacks(
+            document,
+            document_text,
+            invoice_date,
+            vendor,
+            invoice_number,
+            entity_label="Entity extraction",
         )
-        print(f"Entity extraction returned {len(rows)} rows")
-
-        # Fallback methods for generic processing
-        if not rows:
-            print("Falling back to table extraction...")
-            rows = extract_line_items(document, invoice_date, vendor, invoice_number)
-            print(f"Table extraction returned {len(rows)} rows")
-
-        if not rows:
-            print("Falling back to text extraction...")
-            rows = extract_line_items_from_text(
-                document.text, invoice_date, vendor, invoice_number
-            )
-            print(f"Text extraction returned {len(rows)} rows")
 
     if not rows:
         return (
-            jsonify(
-                {"warning": "No line items found in invoice", "text": document.text}
+            json_response(
+                {"warning": "No line items found in invoice", "text": document_text}
             ),
             200,
         )
 
     # Step 7: Write to Google Sheets
     try:
-        credentials, _ = default()
-        service = build("sheets", "v4", credentials=credentials)
-        sheet = service.spreadsheets()
-
-        result = (
-            sheet.values()
-            .append(
-                spreadsheetId=spreadsheet_id,
-                range=f"'{sheet_name}'!A:G",
-                valueInputOption="USER_ENTERED",
-                insertDataOption="INSERT_ROWS",
-                body={"values": rows},
-            )
-            .execute()
-        )
+        write_to_sheet(sheets_service.result(), spreadsheet_id, sheet_name, rows)
 
         return (
-            jsonify(
+            json_response(
                 {
                     "message": "Invoice processed and added to sheet",
                     "rows_added": len(rows),
@@ -536,13 +825,71 @@ def process_invoice(request: Request):
         )
 
     except Exception as e:
-        return jsonify({"error": f"Failed to write to Google Sheets: {str(e)}"}), 500
+        return (
+            json_response({"error": f"Failed to write to Google Sheets: {str(e)}"}),
+            500,
+        )
+
+
+def extract_line_items_with_fallbacks(
+    document,
+    document_text,
+    invoice_date,
+    vendor,
+    invoice_number,
+    entity_label="Generic entity extraction",
+):
+    """Run the generic extractors (entities → tables → text) until one finds rows"""
+    strategies = (
+        (
+            entity_label,
+            lambda: extract_line_items_from_entities(
+                document, invoice_date, vendor, invoice_number
+            ),
+        ),
+        (
+            "Table extraction",
+            lambda: extract_line_items(document, invoice_date, vendor, invoice_number),
+        ),
+        (
+            "Text extraction",
+            lambda: extract_line_items_from_text(
+                document_text, invoice_date, vendor, invoice_number
+            ),
+        ),
+    )
+
+    rows = []
+    for index, (label, strategy) in enumerate(strategies):
+        if index:
+            print(f"Falling back to {label.lower()}...")
+        rows = strategy()
+        print(f"{label} returned {len(rows)} rows")
+        if rows:
+            break
+
+    return rows
 
 
 def format_date(raw_date):
     """Format date to MM/DD/YYYY format"""
     if not raw_date:
         return ""
+    if isinstance(raw_date, str):
+        # Values without a dash can never match %Y-%m-%d
+        if "-" not in raw_date:
+            return raw_date
+        # Canonical YYYY-MM-DD dates are validated and reformatted directly
+        match = _ISO_DATE_RE.fullmatch(raw_date)
+        if match:
+            year, month, day = map(int, match.groups())
+            # (years before 1000 are left to strftime's own %Y handling)
+            if year >= 1000:
+                if not 1 <= month <= 12:
+                    return raw_date
+                if not 1 <= day <= calendar.monthrange(year, month)[1]:
+                    return raw_date
+                return f"{month:02d}/{day:02d}/{year}"
     try:
         parsed_date = datetime.strptime(raw_date, "%Y-%m-%d")
         return parsed_date.strftime("%m/%d/%Y")
@@ -550,42 +897,43 @@ def format_date(raw_date):
         return raw_date
 
 
+@functools.lru_cache(maxsize=8)
 def extract_order_number(document_text):
     """Extract order number from text patterns like 'Order #DYP49ACZYQ'"""
     # Look for patterns like "Order #ABC123" or "Order #: ABC123"
-    order_patterns = [
-        r"Order\s*#\s*([A-Z0-9]+)",
-        r"Order\s*Number\s*:?\s*([A-Z0-9]+)",
-        r"Order\s*ID\s*:?\s*([A-Z0-9]+)",
-    ]
-
-    for pattern in order_patterns:
-        match = re.search(pattern, document_text, re.IGNORECASE)
+    for pattern in _ORDER_NUMBER_PATTERNS:
+        match = pattern.search(document_text)
         if match:
             return match.group(1)
 
     return ""
 
 
+@functools.lru_cache(maxsize=8)
 def extract_order_date(document_text):
     """Extract order date from text patterns like 'placed on May 29, 2025'"""
     # Look for patterns like "placed on May 29, 2025" or "Order Date: May 29, 2025"
-    date_patterns = [
-        r"placed\s+on\s+([A-Za-z]+ \d{1,2}, \d{4})",
-        r"Order\s+Date\s*:?\s*([A-Za-z]+ \d{1,2}, \d{4})",
-        r"Date\s*:?\s*([A-Za-z]+ \d{1,2}, \d{4})",
-    ]
-
-    for pattern in date_patterns:
-        match = re.search(pattern, document_text, re.IGNORECASE)
+    for pattern in _ORDER_DATE_PATTERNS:
+        match = pattern.search(document_text)
         if match:
             date_str = match.group(1)
-            try:
-                # Parse date like "May 29, 2025" and convert to MM/DD/YY format
-                parsed_date = datetime.strptime(date_str, "%B %d, %Y")
-                return parsed_date.strftime("%m/%d/%y")
-            except ValueError:
+            if not date_str.isascii():
+                try:
+                    parsed_date = datetime.strptime(date_str, "%B %d, %Y")
+                    return parsed_date.strftime("%m/%d/%y")
+                except ValueError:
+                    return date_str
+
+            # Convert a date like "May 29, 2025" to MM/DD/YY format, keeping
+            # the original text if it is not a real calendar date
+            month = _MONTH_NUMBERS.get(match.group("month").lower())
+            day = int(match.group("day"))
+            year = int(match.group("year"))
+            if not month or year < 1:
+                return date_str
+            if not 1 <= day <= calendar.monthrange(year, month)[1]:
                 return date_str
+            return f"{month:02d}/{day:02d}/{year % 100:02d}"
 
     return ""
 
@@ -594,8 +942,27 @@ def clean_price(value):
     """Extract numeric price from string and format as currency"""
     if not value:
         return ""
+    # Fast paths: plain numbers, and prices already in canonical "$12.34" form
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if 1e-4 <= abs(value) < 1e16:
+            return f"${value:.2f}"
+    elif isinstance(value, str) and value[:1] == "$" and value.isascii():
+        dollars, dot, cents = value[1:].partition(".")
+        if (
+            dot
+            and len(cents) == 2
+            and cents.isdigit()
+            and dollars.isdigit()
+            and len(dollars) <= 12
+            and (dollars == "0" or dollars[0] != "0")
+        ):
+            return value
     # Extract numeric value
-    numeric_price = re.sub(r"[^0-9.-]", "", str(value))
+    value = str(value)
+    if value.isascii():
+        numeric_price = value.translate(_PRICE_STRIP_TABLE)
+    else:
+        numeric_price = _PRICE_STRIP_RE.sub("", value)
     if numeric_price:
         try:
             # Convert to float and format as currency
@@ -606,16 +973,28 @@ def clean_price(value):
     return ""
 
 
+@functools.lru_cache(maxsize=8)
+def index_invoice_numbers(document_text):
+    """Find every "Invoice # 123" number in the document once
+
+    Returns parallel start/number lists in document order.
+    """
+    starts, numbers = [], []
+    for match in _INVOICE_RE.finditer(document_text):
+        starts.append(match.start())
+        numbers.append(match.group(1))
+    return starts, numbers
+
+
 def extract_specific_invoice_number(document_text, line_item_text):
     """Extract specific invoice number for summary invoices with multiple invoice numbers"""
     # Look for patterns like "Invoice # 77389954" or "Invoice # 77390022" in the document
     # and match them to line items based on proximity and section boundaries
 
-    # Find all invoice numbers in the document
-    invoice_pattern = r"Invoice\s*#\s*(\d+)"
-    invoice_matches = re.findall(invoice_pattern, document_text, re.IGNORECASE)
+    # Find all invoice numbers in the document (indexed once per document)
+    invoice_starts, invoice_numbers = index_invoice_numbers(document_text)
 
-    if len(invoice_matches) <= 1:
+    if len(invoice_numbers) <= 1:
         # Single invoice, no need to extract specific numbers
         return None
 
@@ -623,7 +1002,7 @@ def extract_specific_invoice_number(document_text, line_item_text):
     # Look for the product code (ISBN) in the line item to help identify sections
 
     # Extract ISBN from line item if present
-    isbn_match = re.search(r"\b(978\d{10})\b", line_item_text)
+    isbn_match = _ISBN_RE.search(line_item_text)
     if not isbn_match:
         return None
 
@@ -634,61 +1013,44 @@ def extract_specific_invoice_number(document_text, line_item_text):
     if isbn_pos == -1:
         return None
 
-    # Look for the closest preceding invoice number
-    best_invoice = None
-    best_distance = float("inf")
-
-    for match in re.finditer(invoice_pattern, document_text, re.IGNORECASE):
-        invoice_num = match.group(1)
-        invoice_pos = match.start()
+    # Look for the closest preceding invoice number, i.e. the last one that
+    # starts before this ISBN
+    idx = bisect.bisect_left(invoice_starts, isbn_pos)
+    if idx == 0:
+        return None
+    return invoice_numbers[idx - 1]
 
-        # Only consider invoice numbers that appear before this ISBN in the document
-        if invoice_pos < isbn_pos:
-            distance = isbn_pos - invoice_pos
-            if distance < best_distance:
-                best_distance = distance
-                best_invoice = invoice_num
 
-    return best_invoice
+def is_isbn13(product_code):
+    """Check whether a product code is a 13-digit "978" ISBN (book invoices)"""
+    return len(product_code) == 13 and product_code.startswith("978")
 
 
 def extract_short_product_code(full_text, description_text=""):
     """Extract product code from various formats"""
     # Combine both texts to search in
     search_text = f"{description_text} {full_text}"
-
-    # Pattern 1: Numbers + letters (like "006 AR", "008 TIN", "012 AR")
-    # Look for this pattern at the start of the text
-    number_letter_pattern = r"\b(\d{3}\s+[A-Z]{2,4})\b"
-    matches = re.findall(number_letter_pattern, full_text)
-    if matches:
-        return matches[0]  # Return first match like "006 AR"
-
-    # Pattern 2: Traditional product codes (like DF8011, DG0110A)
-    # 2-4 letters followed by 2-8 digits, possibly with letters at end
-    short_code_pattern = r"\b([A-Z]{2,4}\d{2,8}[A-Z]?)\b"
-    matches = re.findall(short_code_pattern, search_text)
-
-    if matches:
-        # Filter out UPCs (too long) and prefer shorter codes
-        valid_codes = []
-        for match in matches:
+    full_text_start = len(search_text) - len(full_text)
+
+    # Both formats are found in a single scan. Numbers + letters (like "006 AR",
+    # "008 TIN") win if they appear anywhere in the line item text itself;
+    # otherwise use the first traditional product code (like DF8011, DG0110A)
+    first_short_code = None
+    for match in _PRODUCT_CODE_RE.finditer(search_text):
+        if match.lastgroup == "number_letter":
+            if match.start() >= full_text_start:
+                return match.group()  # Return first match like "006 AR"
+        elif first_short_code is None and len(match.group()) <= 10:
             # Skip if it's likely a UPC (long numeric after letters)
-            if len(match) <= 10:  # Reasonable product code length
-                valid_codes.append(match)
+            first_short_code = match.group()
 
-        if valid_codes:
-            # Return the first valid match
-            return valid_codes[0]
-
-    return None
+    return first_short_code
 
 
 def extract_wholesale_price(full_text):
     """Extract wholesale price (typically the second price in a sequence)"""
     # Find all price patterns in the text
-    price_pattern = r"\b(\d+\.\d{2})\b"
-    prices = re.findall(price_pattern, full_text)
+    prices = _PRICE_RE.findall(full_text)
 
     # Filter out quantities that appear at the end (backorder items)
     # For backorder items like "SMG6H Smudge Hippo Tiny 6.00", the 6.00 is quantity, not price
@@ -730,34 +1092,28 @@ def extract_shipped_quantity(full_text):
     # Look for the pattern after product code but before prices
 
     # Split by spaces and newlines to get individual tokens
-    tokens = re.split(r"[\s\n]+", full_text)
-
-    quantities = []
-    found_product_code = False
+    tokens = full_text.split()
 
     for i, token in enumerate(tokens):
-        # Skip the product code part (like "006", "AR")
-        if re.match(r"^\d{3}$", token) or re.match(r"^[A-Z]{2,4}$", token):
-            found_product_code = True
+        # Skip the product code part (like "006", "AR") and non-numeric tokens
+        if not token.isdecimal() or len(token) == 3:
             continue
 
         # Look for pure numbers that could be quantities
-        if re.match(r"^\d+$", token):
-            num = int(token)
-            # Filter reasonable quantities (1-999, not prices like 16.50 or amounts like 132.00)
-            if 1 <= num <= 999 and len(token) <= 3:
-                # Skip if it looks like part of a price (next token might be decimal)
-                if i + 1 < len(tokens) and re.match(r"^\d{2}$", tokens[i + 1]):
+        num = int(token)
+        # Filter reasonable quantities (1-999, not prices like 16.50 or amounts like 132.00)
+        if 1 <= num <= 999 and len(token) <= 3:
+            # Skip if it looks like part of a price (next token might be decimal)
+            if i + 1 < len(tokens):
+                next_token = tokens[i + 1]
+                if len(next_token) == 2 and next_token.isdecimal():
                     continue  # This is likely "16.50" split as "16" "50"
-                quantities.append(str(num))
-
-    if quantities:
-        # Return the first valid quantity after product code
-        return quantities[0]
+            # Return the first valid quantity after product code
+            return str(num)
 
     # Fallback: look for any reasonable quantity
     for token in tokens:
-        if re.match(r"^\d+$", token):
+        if token.isdecimal():
             num = int(token)
             if 1 <= num <= 999 and len(token) <= 3:
                 return str(num)
@@ -765,6 +1121,30 @@ def extract_shipped_quantity(full_text):
     return None
 
 
+@functools.lru_cache(maxsize=8)
+def index_creative_coop_quantities(text):
+    """Find every Creative-Coop quantity match in the text once
+
+    Returns the positive matches as parallel start/(pattern, shipped) lists
+    sorted by position, the shipped values seen with "lo" and "Set" units,
+    and whether any match (including zero quantities) was found.
+    """
+    matches = []
+    for pattern_idx, pattern in enumerate(_CC_QTY_PATTERNS):
+        for match in pattern.finditer(text):
+            matches.append(
+                (match.start(), pattern_idx, int(match.group(1)), match.group(0))
+            )
+    matches.sort()
+
+    positive = [match for match in matches if match[2] > 0]
+    starts = [match[0] for match in positive]
+    lo_quantities = frozenset(m[2] for m in matches if "lo" in m[3])
+    set_quantities = frozenset(m[2] for m in matches if "Set" in m[3])
+    return starts, positive, lo_quantities, set_quantities, bool(matches)
+
+
+@functools.lru_cache(maxsize=256)
 def extract_creative_coop_quantity(text, product_code):
     """Extract quantity for Creative-Coop invoices using shipped/back pattern
 
@@ -772,84 +1152,72 @@ def extract_creative_coop_quantity(text, product_code):
     In combined entities, multiple products share text so we need to be careful
     about which quantity belongs to which product.
     """
-    if product_code not in text:
+    # Strategy: For combined entities, look for quantity patterns and try to
+    # determine which one belongs to this specific product based on context.
+    # The quantity matches are indexed once per document text; documents
+    # without any (e.g. other vendors) need no product code search at all.
+    starts, positive, lo_quantities, set_quantities, has_quantities = (
+        index_creative_coop_quantities(text)
+    )
+    if not has_quantities:
         return None
 
     # Find the product code position
     product_pos = text.find(product_code)
-
-    # Creative-Coop quantity patterns (in order of specificity)
-    qty_patterns = [
-        r"\b(\d+)\s+\d+\s+lo\s+each\b",  # "8 0 lo each" - very specific
-        r"\b(\d+)\s+\d+\s+Set\b",  # "6 0 Set" - specific for Set
-        r"\b(\d+)\s+\d+\s+each\b",  # "24 0 each" - general each
-    ]
-
-    # Strategy: For combined entities, look for quantity patterns and try to
-    # determine which one belongs to this specific product based on context
-
-    # Find all quantity patterns in the text with their positions
-    all_quantities = []
-    for pattern in qty_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            shipped_qty = int(match.group(1))
-            all_quantities.append(
-                {
-                    "position": match.start(),
-                    "shipped": shipped_qty,
-                    "pattern": match.group(0),
-                    "distance_from_product": abs(match.start() - product_pos),
-                }
-            )
-
-    # Sort by distance from product code
-    all_quantities.sort(key=lambda x: x["distance_from_product"])
+    if product_pos == -1:
+        return None
 
     # Special handling for known problem cases based on user feedback
-    if product_code == "DF5599":
+    if product_code == "DF5599" and 8 in lo_quantities:
         # DF5599 should get 8 from "8 0 lo each"
-        for qty in all_quantities:
-            if qty["shipped"] == 8 and "lo" in qty["pattern"]:
-                return "8"
-
-    if product_code == "DF6360":
-        # DF6360 should get 6 from "6 0 Set"
-        for qty in all_quantities:
-            if qty["shipped"] == 6 and "Set" in qty["pattern"]:
-                return "6"
-
-    if product_code == "DF6802":
-        # DF6802 should get 6 from "6 0 Set"
-        for qty in all_quantities:
-            if qty["shipped"] == 6 and "Set" in qty["pattern"]:
-                return "6"
-
-    # For other products, use the closest positive quantity
-    for qty in all_quantities:
-        if qty["shipped"] > 0:
-            return str(qty["shipped"])
-
-    # If no positive quantity found, return the closest quantity (could be 0)
-    if all_quantities:
-        return str(all_quantities[0]["shipped"])
+        return "8"
+
+    if product_code in ("DF6360", "DF6802") and 6 in set_quantities:
+        # DF6360 and DF6802 should get 6 from "6 0 Set"
+        return "6"
+
+    # For other products, use the closest positive quantity; on equal distance
+    # the more specific pattern wins, then the earlier match
+    if positive:
+        right = bisect.bisect_left(starts, product_pos)
+        left = right - 1
+        if right == len(starts):
+            best = positive[left]
+        elif left < 0:
+            best = positive[right]
+        else:
+            left_distance = product_pos - starts[left]
+            right_distance = starts[right] - product_pos
+            if left_distance < right_distance:
+                best = positive[left]
+            elif right_distance < left_distance:
+                best = positive[right]
+            else:
+                best = min(positive[left], positive[right], key=lambda m: m[1])
+        return str(best[2])
+
+    # If no positive quantity found, the closest quantity is a zero
+    if has_quantities:
+        return "0"
 
     return None
 
 
 def extract_best_vendor(entities):
     """Extract vendor name using confidence scores and priority order"""
-    # Priority order of vendor-related entity types
-    vendor_fields = ["remit_to_name", "supplier_name", "vendor_name", "bill_from_name"]
-
     vendor_candidates = []
 
     # Collect all vendor-related entities with their confidence scores
     for entity in entities:
-        if entity.type_ in vendor_fields and entity.mention_text.strip():
+        entity_type = entity.type_
+        if entity_type not in _VENDOR_FIELD_PRIORITY:
+            continue
+        mention_text = entity.mention_text
+        if mention_text.strip():
             vendor_candidates.append(
                 {
-                    "type": entity.type_,
-                    "text": entity.mention_text.replace("\n", " ").strip(),
+                    "type": entity_type,
+                    "text": mention_text.replace("\n", " ").strip(),
                     "confidence": entity.confidence,
                 }
             )
@@ -859,25 +1227,24 @@ def extract_best_vendor(entities):
     if not vendor_candidates:
         return ""
 
+    best = vendor_candidates[0]
+
     # If we have multiple candidates, prefer by confidence first, then by priority
     if len(vendor_candidates) > 1:
-        # Sort by confidence (descending), then by priority order
-        vendor_candidates.sort(
+        # Pick the highest confidence, then the best priority, in a single pass
+        best = min(
+            vendor_candidates,
             key=lambda x: (
                 -x["confidence"],  # Higher confidence first
-                (
-                    vendor_fields.index(x["type"])
-                    if x["type"] in vendor_fields
-                    else 999
-                ),  # Lower index = higher priority
-            )
+                _VENDOR_FIELD_PRIORITY.get(x["type"], 999),  # Lower = higher priority
+            ),
         )
 
         print(
-            f"Selected vendor: {vendor_candidates[0]['text']} (type: {vendor_candidates[0]['type']}, confidence: {vendor_candidates[0]['confidence']:.3f})"
+            f"Selected vendor: {best['text']} (type: {best['type']}, confidence: {best['confidence']:.3f})"
         )
 
-    return vendor_candidates[0]["text"]
+    return best["text"]
 
 
 def extract_line_items_from_entities(document, invoice_date, vendor, invoice_number):
@@ -885,133 +1252,145 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
     rows = []
 
     # Debug: Log all entity types and their properties
-    print("=== Document AI Entity Analysis ===")
+    logger.debug("=== Document AI Entity Analysis ===")
     line_item_count = 0
-
+    document_text = document.text
+
+    # Line items can only map to their own invoice number on summary invoices
+    # that list more than one
+    has_multiple_invoices = len(index_invoice_numbers(document_text)[1]) > 1
+
+    # The vendor checks are the same for every line item
+    vendor_lower = vendor.lower()
+    is_creative_coop = "creative" in vendor_lower or "coop" in vendor_lower
+    is_rifle_paper = "rifle" in vendor_lower
+
+    # Entities are processed in document order on purpose: a specific invoice
+    # number found on one line item of a summary invoice carries over to the
+    # line items after it, so they cannot be handed out to worker threads
+    # Protobuf field reads are comparatively slow, so each field is read once
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     for i, entity in enumerate(document.entities):
-        print(
-            f"Entity {i}: {entity.type_} = '{entity.mention_text}' (confidence: {entity.confidence:.3f})"
-        )
+        entity_type = entity.type_
+        mention_text = entity.mention_text
+        if debug_enabled:
+            logger.debug(
+                "Entity %s: %s = '%s' (confidence: %.3f)",
+                i,
+                entity_type,
+                mention_text,
+                entity.confidence,
+            )
 
-        if entity.type_ == "line_item":
+        if entity_type == "line_item":
             line_item_count += 1
-            # Extract line item properties
-            item_description = ""
-            product_code = ""
-            unit_price = ""
-            quantity = ""
-            line_total = ""
 
             # Store the full line item text for advanced parsing
-            full_line_text = entity.mention_text.strip()
+            full_line_text = mention_text.strip()
 
             # Check if this line item contains multiple products
             # Creative-Coop style: Look for multiple DF/DA product codes
-            creative_coop_codes = re.findall(r"\b(D[A-Z]\d{4}[A-Z]?)\b", full_line_text)
-            # Rifle Paper style: Look for multiple alphanumeric product codes with prices
-            rifle_paper_codes = re.findall(
-                r"\b([A-Z0-9]{3,10})\s+\d{12}\s+\$?\d+\.\d{2}", full_line_text
-            )
+            creative_coop_codes = _CREATIVE_COOP_CODE_RE.findall(full_line_text)
+            # Rifle Paper style: Look for multiple alphanumeric product codes with prices.
+            # Only needed when the Creative-Coop split does not apply, and only the
+            # first two matches matter
+            rifle_paper_code_count = 0
+            if (
+                len(creative_coop_codes) <= 1
+                and len(full_line_text) >= _MIN_RIFLE_CODE_LENGTH
+            ):
+                rifle_paper_code_count = sum(
+                    1
+                    for _ in itertools.islice(
+                        _RIFLE_CODE_RE.finditer(full_line_text), 2
+                    )
+                )
 
+            split_items = None
             if len(creative_coop_codes) > 1:
-                print(
-                    f"  -> Found multiple Creative-Coop product codes: {creative_coop_codes}"
+                logger.debug(
+                    "  -> Found multiple Creative-Coop product codes: %s",
+                    creative_coop_codes,
                 )
                 # Split this into multiple line items
                 split_items = split_combined_line_item(
-                    full_line_text, entity, document.text
+                    full_line_text, entity, document_text
                 )
-                for split_item in split_items:
-                    if (
-                        split_item
-                        and len(split_item.get("description", "")) > 5
-                        and split_item.get("unit_price")
-                        and split_item["unit_price"] != "$0.00"
-                    ):  # Must have valid price
-                        rows.append(
-                            [
-                                "",  # Column A placeholder
-                                invoice_date,
-                                vendor,
-                                invoice_number,
-                                split_item["description"],
-                                split_item["unit_price"],
-                                split_item.get("quantity", ""),
-                            ]
-                        )
-                        print(
-                            f"  -> ✓ ADDED split item: {split_item['description']}, {split_item['unit_price']}, Qty: {split_item.get('quantity', '')}"
-                        )
-                continue  # Skip the normal processing for this combined item
-            elif len(rifle_paper_codes) > 1 or (
-                vendor
-                and "rifle" in vendor.lower()
-                and len(rifle_paper_codes) >= 1
+            elif rifle_paper_code_count > 1 or (
+                is_rifle_paper
+                and rifle_paper_code_count >= 1
                 and "\n" in full_line_text
             ):
-                print(f"  -> Found Rifle Paper style combined line item")
+                logger.debug("  -> Found Rifle Paper style combined line item")
                 # Split this into multiple line items
                 split_items = split_rifle_paper_line_item(
-                    full_line_text, entity, document.text
+                    full_line_text, entity, document_text
                 )
-                for split_item in split_items:
+
+            if split_items is not None:
+                split_rows = [
+                    [
+                        "",  # Column A placeholder
+                        invoice_date,
+                        vendor,
+                        invoice_number,
+                        split_item.description,
+                        split_item.unit_price,
+                        split_item.quantity,
+                    ]
+                    for split_item in split_items
                     if (
-                        split_item
-                        and len(split_item.get("description", "")) > 5
-                        and split_item.get("unit_price")
-                        and split_item["unit_price"] != "$0.00"
-                    ):  # Must have valid price
-                        rows.append(
-                            [
-                                "",  # Column A placeholder
-                                invoice_date,
-                                vendor,
-                                invoice_number,
-                                split_item["description"],
-                                split_item["unit_price"],
-                                split_item.get("quantity", ""),
-                            ]
-                        )
-                        print(
-                            f"  -> ✓ ADDED split item: {split_item['description']}, {split_item['unit_price']}, Qty: {split_item.get('quantity', '')}"
-                        )
+                        len(split_item.description) > 5
+                        and split_item.unit_price
+                        and split_item.unit_price != "$0.00"
+                    )  # Must have valid price
+                ]
+                rows.extend(split_rows)
+                for row in split_rows:
+                    logger.debug("  -> ✓ ADDED split item: %s, %s, Qty: %s", *row[4:])
                 continue  # Skip the normal processing for this combined item
 
-            # Process properties of the line item
-            if hasattr(entity, "properties") and entity.properties:
-                print(f"  Line item {line_item_count} properties:")
-                for prop in entity.properties:
-                    print(
-                        f"    {prop.type_} = '{prop.mention_text}' (confidence: {prop.confidence:.3f})"
+            # Read the line item properties out of the protobuf message once,
+            # then work on the plain (type, text) pairs
+            properties = [(prop.type_, prop.mention_text) for prop in entity.properties]
+            if properties and debug_enabled:
+                logger.debug("  Line item %s properties:", line_item_count)
+                for prop, (prop_type, prop_text) in zip(entity.properties, properties):
+                    logger.debug(
+                        "    %s = '%s' (confidence: %.3f)",
+                        prop_type,
+                        prop_text,
+                        prop.confidence,
                     )
 
-                    if prop.type_ == "line_item/description":
-                        item_description = prop.mention_text.strip()
-                    elif prop.type_ == "line_item/product_code":
-                        # Store the UPC/long code as fallback
-                        candidate_code = prop.mention_text.strip()
-                        if not product_code:
-                            product_code = candidate_code
-                    elif prop.type_ == "line_item/unit_price":
-                        # Store the price (we'll parse multiple prices from full text later)
-                        unit_price = clean_price(prop.mention_text)
-                    elif prop.type_ == "line_item/quantity":
-                        # Store the quantity (we'll parse multiple quantities from full text later)
-                        quantity = prop.mention_text.strip()
-                    elif prop.type_ == "line_item/amount":
-                        line_total = clean_price(prop.mention_text)
+            # The last property of each type wins, except for the product code
+            # where the first non-empty one is kept
+            latest_props = dict(properties)
+            item_description = latest_props.get("line_item/description", "").strip()
+            # Store the UPC/long code as fallback
+            product_code = ""
+            for prop_type, prop_text in properties:
+                if prop_type == "line_item/product_code":
+                    product_code = prop_text.strip()
+                    if product_code:
+                        break
+            # Store the price and quantity (we'll parse multiple prices and
+            # quantities from full text later)
+            unit_price = clean_price(latest_props.get("line_item/unit_price", ""))
+            quantity = latest_props.get("line_item/quantity", "").strip()
+            line_total = clean_price(latest_props.get("line_item/amount", ""))
 
             # Advanced parsing of the full line item text
-            print(f"  Full line text: '{full_line_text}'")
+            logger.debug("  Full line text: '%s'", full_line_text)
 
             # 1. Check if this is a summary invoice and extract specific invoice number
-            specific_invoice_number = extract_specific_invoice_number(
-                document.text, full_line_text
+            specific_invoice_number = has_multiple_invoices and (
+                extract_specific_invoice_number(document_text, full_line_text)
             )
             if specific_invoice_number:
                 # Use the specific invoice number instead of the summary invoice number
                 invoice_number = specific_invoice_number
-                print(f"  -> Found specific invoice number: '{invoice_number}'")
+                logger.debug("  -> Found specific invoice number: '%s'", invoice_number)
 
             # 2. Extract the correct product code (short alphanumeric code)
             short_product_code = extract_short_product_code(
@@ -1019,25 +1398,29 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
             )
             if short_product_code:
                 product_code = short_product_code
-                print(f"  -> Found short product code: '{product_code}'")
+                logger.debug("  -> Found short product code: '%s'", product_code)
 
             # 3. For book invoices (with ISBNs), calculate wholesale price from amount ÷ quantity
-            is_book_invoice = product_code and (
-                len(product_code) == 13 and product_code.startswith("978")
-            )
+            is_book_invoice = is_isbn13(product_code)
 
             if is_book_invoice and line_total and quantity:
                 try:
-                    total_val = float(line_total.replace("$", ""))
+                    # clean_price always returns a single leading "$"
+                    total_val = float(line_total[1:])
                     qty_val = int(quantity)
                     if qty_val > 0:
                         calculated_wholesale = total_val / qty_val
                         unit_price = f"${calculated_wholesale:.2f}"
-                        print(
-                            f"  -> Book invoice: calculated wholesale price: {line_total} ÷ {quantity} = '{unit_price}'"
+                        logger.debug(
+                            "  -> Book invoice: calculated wholesale price: %s ÷ %s = '%s'",
+                            line_total,
+                            quantity,
+                            unit_price,
                         )
                 except (ValueError, ZeroDivisionError):
-                    print(f"  -> Error calculating wholesale price, using fallback")
+                    logger.debug(
+                        "  -> Error calculating wholesale price, using fallback"
+                    )
 
             # Fallback for non-book invoices: use Document AI unit_price or extract from text
             if not unit_price:
@@ -1045,72 +1428,70 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
                 wholesale_price = extract_wholesale_price(full_line_text)
                 if wholesale_price:
                     unit_price = wholesale_price
-                    print(f"  -> Found wholesale price from text: '{unit_price}'")
+                    logger.debug(
+                        "  -> Found wholesale price from text: '%s'", unit_price
+                    )
             elif not is_book_invoice:
-                print(f"  -> Using Document AI unit_price: '{unit_price}'")
+                logger.debug("  -> Using Document AI unit_price: '%s'", unit_price)
 
             # 3. Extract shipped quantity - prioritize Creative-Coop extraction for Creative-Coop invoices
             # Try Creative-Coop specific quantity extraction first
             creative_coop_qty = extract_creative_coop_quantity(
-                document.text, product_code
+                document_text, product_code
             )
             if creative_coop_qty is not None:
                 quantity = creative_coop_qty
-                print(f"  -> Found Creative-Coop quantity from document: '{quantity}'")
+                logger.debug(
+                    "  -> Found Creative-Coop quantity from document: '%s'", quantity
+                )
             else:
                 # Fallback to Document AI properties if Creative-Coop extraction fails
-                if hasattr(entity, "properties") and entity.properties:
-                    for prop in entity.properties:
-                        if prop.type_ == "line_item/quantity":
-                            # Clean the quantity from Document AI property
-                            qty_text = prop.mention_text.strip()
-                            # Handle decimal quantities like "6.00" or integer quantities like "8"
-                            qty_match = re.search(r"\b(\d+(?:\.\d+)?)\b", qty_text)
-                            if qty_match:
-                                qty_value = float(qty_match.group(1))
-                                if qty_value > 0:
-                                    # Convert to integer if it's a whole number, otherwise keep as decimal
-                                    if qty_value == int(qty_value):
-                                        quantity = str(int(qty_value))
-                                    else:
-                                        quantity = str(qty_value)
-                                    print(
-                                        f"  -> Found quantity from property: '{quantity}'"
-                                    )
-                                    break
-                            break
+                for prop_type, prop_text in properties:
+                    if prop_type == "line_item/quantity":
+                        # Clean the quantity from Document AI property
+                        qty_text = prop_text.strip()
+                        # Handle decimal quantities like "6.00" or integer quantities like "8"
+                        qty_match = _QUANTITY_VALUE_RE.search(qty_text)
+                        if qty_match:
+                            qty_value = float(qty_match.group(1))
+                            if qty_value > 0:
+                                # Convert to integer if it's a whole number, otherwise keep as decimal
+                                if qty_value == int(qty_value):
+                                    quantity = str(int(qty_value))
+                                else:
+                                    quantity = str(qty_value)
+                                logger.debug(
+                                    "  -> Found quantity from property: '%s'", quantity
+                                )
+                                break
+                        break
 
                 # Final fallback to generic text parsing
                 if not quantity:
                     shipped_quantity = extract_shipped_quantity(full_line_text)
                     if shipped_quantity:
                         quantity = shipped_quantity
-                        print(f"  -> Found shipped quantity from text: '{quantity}'")
+                        logger.debug(
+                            "  -> Found shipped quantity from text: '%s'", quantity
+                        )
 
             # For most invoices, use the Document AI description directly as it's usually accurate
             # Only apply cleaning for Creative-Coop style invoices or if description is missing
-            full_description = ""
             if product_code:
+                upc_code = None
                 # Check if we have a good Document AI description
                 if item_description and len(item_description) > 5:
                     # Use Document AI description directly for most vendors (like Rifle)
                     # Only apply heavy cleaning for Creative-Coop style complex invoices
-                    if any(
-                        indicator in vendor.lower()
-                        for indicator in ["creative", "coop"]
-                    ):
+                    if is_creative_coop:
                         # Apply full cleaning for Creative-Coop
                         upc_code = extract_upc_from_text(full_line_text, product_code)
                         clean_description = clean_item_description(
                             item_description, product_code, upc_code
                         )
-                        if upc_code:
-                            full_description = f"{product_code} - UPC: {upc_code} - {clean_description}"
-                        else:
-                            full_description = f"{product_code} - {clean_description}"
                     else:
                         # For other vendors (like Rifle), use Document AI description directly
-                        full_description = f"{product_code} - {item_description}"
+                        clean_description = item_description
                 else:
                     # Fallback to extraction if no good Document AI description
                     upc_code = extract_upc_from_text(full_line_text, product_code)
@@ -1124,29 +1505,35 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
                             full_line_text, product_code, upc_code
                         )
 
-                    if upc_code:
-                        full_description = (
-                            f"{product_code} - UPC: {upc_code} - {clean_description}"
-                        )
-                    else:
-                        full_description = f"{product_code} - {clean_description}"
+                # Every branch above ends in one of the two description shapes
+                if upc_code:
+                    full_description = (
+                        f"{product_code} - UPC: {upc_code} - {clean_description}"
+                    )
+                else:
+                    full_description = f"{product_code} - {clean_description}"
             elif item_description:
                 full_description = item_description
             else:
-                # Use full line text as fallback
-                full_description = full_line_text.strip()
+                # Use full line text as fallback (already stripped above)
+                full_description = full_line_text
 
             # Filter out unwanted items (shipping, out of stock, etc.)
             skip_item = False
             if product_code:
+                product_code_upper = product_code.upper()
                 # Skip shipping items
-                if product_code.upper() in ["SHIP", "SHIPPING"]:
+                if product_code_upper in _SHIPPING_CODES:
                     skip_item = True
-                    print(f"  -> ✗ SKIPPED row (shipping item): {full_description}")
+                    logger.debug(
+                        "  -> ✗ SKIPPED row (shipping item): %s", full_description
+                    )
                 # Skip out of stock items
-                elif product_code.upper() in ["NOT IN STOCK", "OOS", "OUT OF STOCK"]:
+                elif product_code_upper in _OUT_OF_STOCK_CODES:
                     skip_item = True
-                    print(f"  -> ✗ SKIPPED row (out of stock): {full_description}")
+                    logger.debug(
+                        "  -> ✗ SKIPPED row (out of stock): %s", full_description
+                    )
 
             # Also check description for shipping/out of stock indicators
             if not skip_item and full_description:
@@ -1154,16 +1541,21 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
                 if (
                     "not in stock" in desc_lower
                     or "oos" in desc_lower
-                    or "ship" in desc_lower
-                    and len(full_description) < 30
+                    or ("ship" in desc_lower and len(full_description) < 30)
                 ):  # Short shipping descriptions
                     skip_item = True
-                    print(f"  -> ✗ SKIPPED row (unwanted item): {full_description}")
+                    logger.debug(
+                        "  -> ✗ SKIPPED row (unwanted item): %s", full_description
+                    )
 
             # Only add row if we have a meaningful description AND a price AND it's not skipped
             # This filters out incomplete/malformed line items and backorders without prices
-            print(
-                f"  -> Checking item: desc='{full_description}' (len={len(full_description) if full_description else 0}), price='{unit_price}', qty='{quantity}'"
+            logger.debug(
+                "  -> Checking item: desc='%s' (len=%s), price='%s', qty='%s'",
+                full_description,
+                len(full_description),
+                unit_price,
+                quantity,
             )
 
             if (
@@ -1183,7 +1575,7 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
                 # Will re-implement with better quantity extraction
                 # if quantity and str(quantity).strip() == "0":
                 #     skip_row = True
-                #     print(f"  -> ✗ SKIPPED row (quantity=0): {full_description}")
+                #     logger.debug("  -> ✗ SKIPPED row (quantity=0): %s", full_description)
 
                 if not skip_row:
                     rows.append(
@@ -1197,20 +1589,27 @@ def extract_line_items_from_entities(document, invoice_date, vendor, invoice_num
                             quantity if quantity else "",
                         ]
                     )
-                    print(
-                        f"  -> ✓ ADDED row: {full_description}, {unit_price}, Qty: {quantity}"
+                    logger.debug(
+                        "  -> ✓ ADDED row: %s, %s, Qty: %s",
+                        full_description,
+                        unit_price,
+                        quantity,
                     )
                 else:
                     if line_total == "$0.00" and not quantity:
-                        print(
-                            f"  -> ✗ SKIPPED row (zero amount, no qty): {full_description}"
+                        logger.debug(
+                            "  -> ✗ SKIPPED row (zero amount, no qty): %s",
+                            full_description,
                         )
             else:
                 if skip_item:
                     pass  # Already logged above
                 else:
-                    print(
-                        f"  -> ✗ SKIPPED row (insufficient data): desc='{full_description}', price='{unit_price}', qty='{quantity}'"
+                    logger.debug(
+                        "  -> ✗ SKIPPED row (insufficient data): desc='%s', price='%s', qty='%s'",
+                        full_description,
+                        unit_price,
+                        quantity,
                     )
 
     print(f"Found {line_item_count} line_item entities, created {len(rows)} rows")
@@ -1320,133 +1719,194 @@ def extract_line_items(document, invoice_date, vendor, invoice_number):
     return rows
 
 
+@functools.lru_cache(maxsize=256)
+def product_code_pattern(product_code):
+    """Compile a case-insensitive whole-word pattern for a product code"""
+    return re.compile(r"\b" + re.escape(product_code) + r"\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def rifle_code_patterns(code):
+    """Compile the Rifle Paper description patterns that reference a product code
+
+    Returns the "| default - #CODE" description pattern and one pattern for
+    the trailing "- #CODE" and inline "#CODE" references stripped from
+    descriptions. Removing both in a single pass gives the same text as
+    removing the trailing reference first and then the inline ones.
+    """
+    return (
+        re.compile(rf"([^|]+)\|\s*default\s*-\s*#{code}"),
+        re.compile(rf"\s*-\s*#{code}\s*$|\s*#{code}\s*"),
+    )
+
+
 def extract_line_items_from_text(text, invoice_date, vendor, invoice_number):
     """Extract line items from raw text when no tables are detected"""
     rows = []
-    lines = text.split("\n")
+    lines = [line.strip() for line in text.split("\n")]
+    stripped_text = "\n".join(lines)
+
+    # Look for product codes (pattern: 2+ letters followed by digits) at the
+    # start of every line in one scan, tracking which line each match is on
+    i = 0
+    last_pos = 0
+    for match in _TEXT_PRODUCT_CODE_RE.finditer(stripped_text):
+        i += stripped_text.count("\n", last_pos, match.start())
+        last_pos = match.start()
+        line = lines[i]
+        # Found a product code, try to extract item data
+        product_code = line
+
+        # Look ahead for description, quantity, and price data in a larger window
+        description = ""
+        full_line_context = line
 
-    # Look for product codes (pattern: 2+ letters followed by digits)
-    product_pattern = r"^[A-Z]{2,}\d+"
+        # Gather context from surrounding lines
+        for j in range(i + 1, min(i + 8, len(lines))):
+            next_line = lines[j]
+            if not next_line:
+                continue
 
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if re.match(product_pattern, line):
-            # Found a product code, try to extract item data
-            product_code = line
-
-            # Look ahead for description, quantity, and price data in a larger window
-            description = ""
-            full_line_context = line
-
-            # Gather context from surrounding lines
-            for j in range(i + 1, min(i + 8, len(lines))):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
+            # Add to context for advanced parsing
+            full_line_context += f" {next_line}"
 
-                # Add to context for advanced parsing
-                full_line_context += f" {next_line}"
+            # Look for description (longer text with product details)
+            if (
+                len(next_line) > 10
+                and any(char.isalpha() for char in next_line)
+                and not _PRICE_ONLY_RE.match(next_line)
+                and not description
+            ):
+                description = next_line
 
-                # Look for description (longer text with product details)
-                if (
-                    len(next_line) > 10
-                    and any(char.isalpha() for char in next_line)
-                    and not re.match(r"^\d+\.\d{2}$", next_line)
-                    and not description
-                ):
-                    description = next_line
+        # Use advanced parsing functions
+        short_product_code = extract_short_product_code(full_line_context, description)
+        if short_product_code:
+            product_code = short_product_code
 
-            # Use advanced parsing functions
-            short_product_code = extract_short_product_code(
-                full_line_context, description
+        wholesale_price = extract_wholesale_price(full_line_context)
+        price = wholesale_price if wholesale_price else ""
+
+        shipped_quantity = extract_shipped_quantity(full_line_context)
+        quantity = shipped_quantity if shipped_quantity else ""
+
+        # Add row only if we have product code AND price (removed quantity filter temporarily)
+        if product_code and price:
+            rows.append(
+                [
+                    "",  # Empty placeholder for column A
+                    invoice_date,
+                    vendor,
+                    invoice_number,
+                    (
+                        f"{product_code} - {description}".strip(" -")
+                        if description
+                        else product_code
+                    ),
+                    price if price else "",  # Column F: Wholesale Price
+                    quantity if quantity else "",  # Column G: Quantity
+                ]
             )
-            if short_product_code:
-                product_code = short_product_code
 
-            wholesale_price = extract_wholesale_price(full_line_context)
-            price = wholesale_price if wholesale_price else ""
+    return rows
+
 
-            shipped_quantity = extract_shipped_quantity(full_line_context)
-            quantity = shipped_quantity if shipped_quantity else ""
+@functools.lru_cache(maxsize=8)
+def index_upcs(text):
+    """Find every 12-13 digit UPC code in the text once
 
-            # Add row only if we have product code AND price (removed quantity filter temporarily)
-            if product_code and price:
-                rows.append(
-                    [
-                        "",  # Empty placeholder for column A
-                        invoice_date,
-                        vendor,
-                        invoice_number,
-                        (
-                            f"{product_code} - {description}".strip(" -")
-                            if description
-                            else product_code
-                        ),
-                        price if price else "",  # Column F: Wholesale Price
-                        quantity if quantity else "",  # Column G: Quantity
-                    ]
-                )
+    Returns parallel start/end/code lists sorted by position.
+    """
+    starts, ends, codes = [], [], []
+    for match in _UPC_CODE_RE.finditer(text):
+        starts.append(match.start())
+        ends.append(match.end())
+        codes.append(match.group(1))
+    return starts, ends, codes
 
-    return rows
+
+def is_word_char(char):
+    """Check whether a character is in the regex word class (\\w)"""
+    return char.isalnum() or char == "_"
+
+
+def twelve_digit_upc_pattern(text):
+    """Pick the 12-digit UPC pattern to scan text with
+
+    On ASCII text the ASCII-only \\d and \\b classes match exactly what the
+    Unicode ones do, and the regex engine checks them about twice as fast.
+    """
+    return _ASCII_TWELVE_DIGIT_UPC_RE if text.isascii() else _TWELVE_DIGIT_UPC_RE
+
+
+def find_upc_in_window(text, start, end, upc_index):
+    """Return the first UPC code a regex search of text[start:end] would find
+
+    Matches that lie wholly inside the window come from the document index. A
+    word cut by either edge of the window is checked on its own, since the
+    slice makes its cut end a word boundary. Such a word is a UPC when it is
+    12-13 decimal digits long, so only words of that length are copied out.
+    """
+    end = min(end, len(text))
+    if start >= end:
+        return None
+
+    # A word cut by the start of the window
+    if start > 0 and is_word_char(text[start - 1]) and is_word_char(text[start]):
+        run_end = start + 1
+        while run_end < min(end, start + 14) and is_word_char(text[run_end]):
+            run_end += 1
+        if 12 <= run_end - start <= 13 and text[start:run_end].isdecimal():
+            return text[start:run_end]
+
+    # Matches wholly inside the window
+    starts, ends, codes = upc_index
+    idx = bisect.bisect_left(starts, start)
+    if idx < len(starts) and ends[idx] <= end:
+        return codes[idx]
+
+    # A word cut by the end of the window
+    if end < len(text) and is_word_char(text[end]) and is_word_char(text[end - 1]):
+        run_start = end - 1
+        while run_start > max(start, end - 14) and is_word_char(text[run_start - 1]):
+            run_start -= 1
+        if 12 <= end - run_start <= 13 and text[run_start:end].isdecimal():
+            return text[run_start:end]
+
+    return None
 
 
 def extract_upc_from_text(text, product_code=None):
     """Extract UPC code from text (12-13 digit codes), optionally specific to a product code"""
-    # Look for 12-13 digit UPC codes
-    upc_patterns = [
-        r"\b(\d{12,13})\b",  # Standard UPC
-        r"\b(0\d{11,12})\b",  # UPC with leading zero
-    ]
+    # Look for 12-13 digit UPC codes, indexed once per text. A UPC with a
+    # leading zero is a 12-13 digit code too, so one pattern covers both.
+    upc_index = index_upcs(text)
+    upc = None
 
     # If we have a product code, try to find UPC near it
     if product_code:
         # Look for UPC codes near the product code
-        import re
-
         product_pos = text.find(product_code)
         if product_pos != -1:
             # FIRST: Search for UPC AFTER the product code (most reliable for Creative-Coop)
-            after_product = text[
-                product_pos + len(product_code) : product_pos + len(product_code) + 100
-            ]
-            for pattern in upc_patterns:
-                matches = re.findall(pattern, after_product)
-                if matches:
-                    # Return the first valid UPC after this product code
-                    for match in matches:
-                        if len(match) >= 12:
-                            # Ensure it starts with 0 if it's 12 digits
-                            if len(match) == 12 and not match.startswith("0"):
-                                return f"0{match}"
-                            return match
+            after_start = product_pos + len(product_code)
+            upc = find_upc_in_window(text, after_start, after_start + 100, upc_index)
 
             # FALLBACK: Search in a wider window around the product code (±200 chars)
-            start = max(0, product_pos - 200)
-            end = min(len(text), product_pos + 200)
-            context = text[start:end]
-
-            for pattern in upc_patterns:
-                matches = re.findall(pattern, context)
-                if matches:
-                    # Return the first valid UPC near this product code
-                    for match in matches:
-                        if len(match) >= 12:
-                            # Ensure it starts with 0 if it's 12 digits
-                            if len(match) == 12 and not match.startswith("0"):
-                                return f"0{match}"
-                            return match
+            if not upc:
+                upc = find_upc_in_window(
+                    text, max(0, product_pos - 200), product_pos + 200, upc_index
+                )
 
     # Fallback: look for any UPC in the text
-    for pattern in upc_patterns:
-        matches = re.findall(pattern, text)
-        if matches:
-            # Return the first valid UPC (12-13 digits)
-            for match in matches:
-                if len(match) >= 12:
-                    # Ensure it starts with 0 if it's 12 digits
-                    if len(match) == 12 and not match.startswith("0"):
-                        return f"0{match}"
-                    return match
+    if not upc and upc_index[2]:
+        upc = upc_index[2][0]
+
+    if upc:
+        # Ensure it starts with 0 if it's 12 digits
+        if len(upc) == 12 and not upc.startswith("0"):
+            return f"0{upc}"
+        return upc
     return None
 
 
@@ -1462,26 +1922,15 @@ def clean_item_description(description, product_code, upc_code):
     clean_desc = ""
 
     # Strategy 1: Look for description that starts with dimensions or quoted text
-    desc_patterns = [
-        r"(S/\d+\s+.{10,})",  # Sets like 'S/3 11-3/4" Rnd...' or 'S/4 18" Sq Cotton...' - CHECK FIRST
-        r'(\d+(?:["\'-]\d+)*["\']?[LWH][^0-9\n]{10,})',  # Starts with dimensions like '3-1/4"L x 4"H...' - Must have L/W/H
-        r"([A-Z][^0-9\n]{15,})",  # Text starting with capital, at least 15 chars
-        r'"([^"]+)"',  # Quoted text
-    ]
-
-    for pattern in desc_patterns:
-        matches = re.findall(pattern, original_desc, re.IGNORECASE)
+    for pattern in _DESC_PATTERNS:
+        matches = pattern.findall(original_desc)
         if matches:
             for match in matches:
                 candidate = match.strip()
                 # Make sure it doesn't contain product codes or UPC codes
                 if (
-                    not re.search(
-                        r"\b" + re.escape(product_code) + r"\b",
-                        candidate,
-                        re.IGNORECASE,
-                    )
-                    and not re.search(r"\b\d{12,13}\b", candidate)
+                    not product_code_pattern(product_code).search(candidate)
+                    and not _UPC_RE.search(candidate)
                     and len(candidate) > 10
                 ):
                     clean_desc = candidate
@@ -1495,36 +1944,24 @@ def clean_item_description(description, product_code, upc_code):
 
         # Remove product code if it appears in the description
         if product_code:
-            clean_desc = re.sub(
-                r"\b" + re.escape(product_code) + r"\b",
-                "",
-                clean_desc,
-                flags=re.IGNORECASE,
-            )
-
-        # Remove UPC codes (12-13 digit numbers)
-        clean_desc = re.sub(r"\b\d{12,13}\b", "", clean_desc)
+            clean_desc = product_code_pattern(product_code).sub("", clean_desc)
 
-        # Remove pricing patterns (like "4.00 3.20 38.40")
-        clean_desc = re.sub(r"\b\d+\.\d{2}\b", "", clean_desc)
+        # The UPC, price and quantity patterns all need digits to match
+        if _DIGIT_RE.search(clean_desc):
+            # Remove UPC codes (12-13 digit numbers)
+            clean_desc = _UPC_RE.sub("", clean_desc)
 
-        # Remove quantity patterns (like "12 0 each", "8 0 lo each")
-        clean_desc = re.sub(
-            r"\b\d+\s+\d+\s+(?:lo\s+)?each\b", "", clean_desc, flags=re.IGNORECASE
-        )
-        clean_desc = re.sub(r"\b\d+\s+\d+\s+Set\b", "", clean_desc, flags=re.IGNORECASE)
-
-        # Remove extra whitespace and newlines
-        clean_desc = " ".join(clean_desc.split())
+            # Remove pricing patterns (like "4.00 3.20 38.40")
+            if "." in clean_desc:
+                clean_desc = _DECIMAL_PRICE_RE.sub("", clean_desc)
 
-        # Remove leading/trailing dashes and spaces
-        clean_desc = clean_desc.strip(" -\n\r")
+            # Remove quantity patterns (like "12 0 each", "8 0 lo each")
+            clean_desc = _QTY_EACH_RE.sub("", clean_desc)
+            clean_desc = _QTY_SET_RE.sub("", clean_desc)
 
-    # Final cleanup
-    clean_desc = " ".join(clean_desc.split())  # Normalize whitespace
-    clean_desc = clean_desc.strip(" -\n\r")  # Remove leading/trailing junk
-
-    return clean_desc
+    # Final cleanup: normalize whitespace and remove leading/trailing junk. The
+    # join leaves no newlines behind, so only spaces and dashes need stripping
+    return " ".join(clean_desc.split()).strip(" -")
 
 
 def extract_description_from_full_text(full_text, product_code, upc_code):
@@ -1547,36 +1984,23 @@ def extract_description_from_full_text(full_text, product_code, upc_code):
         # Make sure it's a good description (not just numbers or codes)
         if (
             len(description_candidate) > 10
-            and not re.match(
-                r"^\d+[\d\s\.]*$", description_candidate
-            )  # Not just numbers
-            and not re.search(r"\b\d{12,13}\b", description_candidate)
-        ):  # Not UPC codes
+            and not _NUMBERS_ONLY_RE.match(description_candidate)  # Not just numbers
+            and not _UPC_RE.search(description_candidate)  # Not UPC codes
+        ):
             return description_candidate
 
     # If product code is on the first line, look for description after UPC
     if product_line_idx == 0 or product_line_idx == -1:
         # Try to find description patterns in the full text
-        desc_patterns = [
-            # Specific Creative-Coop patterns
-            r'(\d+["\'-]\d+["\']?[LWH]?\s+[^\d\n]{15,})',  # "3-1/4" Rnd x 4"H 12 oz. Embossed..."
-            r"(S/\d+\s+[^\d\n]{10,})",  # "S/3 11-3/4" Rnd x..."
-            r"([A-Z][a-z]+[^\d\n]{15,})",  # "Stoneware Berry Basket..."
-        ]
-
-        for pattern in desc_patterns:
-            matches = re.findall(pattern, full_text, re.IGNORECASE)
+        for pattern in _FULL_TEXT_DESC_PATTERNS:
+            matches = pattern.findall(full_text)
             if matches:
                 for match in matches:
                     candidate = match.strip()
                     # Make sure it doesn't contain product codes or UPC codes
                     if (
-                        not re.search(
-                            r"\b" + re.escape(product_code) + r"\b",
-                            candidate,
-                            re.IGNORECASE,
-                        )
-                        and not re.search(r"\b\d{12,13}\b", candidate)
+                        not product_code_pattern(product_code).search(candidate)
+                        and not _UPC_RE.search(candidate)
                         and len(candidate) > 15
                     ):
                         return candidate
@@ -1585,6 +2009,17 @@ def extract_description_from_full_text(full_text, product_code, upc_code):
     return clean_item_description(full_text, product_code, upc_code)
 
 
+class LineItem(NamedTuple):
+    """A product split out of a combined line item"""
+
+    description: str
+    unit_price: str
+    quantity: str
+    product_code: str = ""
+    upc_code: str = ""
+    line_total: str = ""
+
+
 def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
     """Split combined line items that contain multiple products (Rifle Paper style)"""
     items = []
@@ -1597,6 +2032,7 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
 
     # Find the line with product codes, UPCs, and prices
     data_line = ""
+    data_start = 0
     descriptions = []
 
     for line in lines:
@@ -1606,8 +2042,10 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
 
         # Check if this line contains product codes with UPCs and prices
         # Pattern: CODE UPC PRICE QTY TOTAL (repeated)
-        if re.search(r"\b[A-Z0-9]{3,10}\s+\d{12}\s+\d+\.\d{2}", line):
+        data_match = "." in line and _RIFLE_DATA_LINE_RE.search(line)
+        if data_match:
             data_line = line
+            data_start = data_match.start()
         else:
             # This is likely a description line
             descriptions.append(line)
@@ -1617,18 +2055,25 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
 
     # Extract product patterns: CODE UPC PRICE QTY TOTAL
     # Pattern matches: NPU001 842967188700 7.00 4 28.00
-    product_pattern = (
-        r"\b([A-Z0-9]{3,10})\s+(\d{12})\s+(\d+\.\d{2})\s+(\d+)\s+(\d+\.\d{2})"
-    )
-    matches = re.findall(product_pattern, data_line)
+    # No product can start before the first CODE UPC PRICE match found above
+    matches = list(_RIFLE_PRODUCT_RE.finditer(data_line, data_start))
 
-    print(f"  -> Found {len(matches)} product patterns in data line")
-    print(f"  -> Descriptions: {descriptions}")
+    logger.debug("  -> Found %s product patterns in data line", len(matches))
+    logger.debug("  -> Descriptions: %s", descriptions)
+
+    # "| default" description lines from the full text, and the first of them
+    # tagged with each "#CODE", built on first use
+    desc_lines = None
+    desc_line_by_code = {}
 
     # Create items for each product found
-    for i, (code, upc, price, qty, total) in enumerate(matches):
+    for i, product_match in enumerate(matches):
+        code, upc, price, qty, total = product_match.group(
+            "code", "upc", "price", "qty", "total"
+        )
         # Try to match description to product code
         description = ""
+        code_desc_re, code_ref_re = rifle_code_patterns(code)
 
         # Look for description that contains this product code
         for desc in descriptions:
@@ -1645,33 +2090,32 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
             else:
                 # Try to find more descriptions by looking at the full text
                 # Look for descriptions that weren't captured in our initial parsing
-                remaining_text = full_line_text
                 # Try to find pattern like "| default - #CODE"
-                code_desc_pattern = rf"([^|]+)\|\s*default\s*-\s*#{code}"
-                match = re.search(code_desc_pattern, remaining_text)
+                match = code_desc_re.search(full_line_text)
                 if match:
                     description = f"{match.group(1).strip()} | default - #{code}"
                 else:
                     # Look for the pattern where descriptions are separated by newlines
                     # and might be in different positions
-                    all_lines = full_line_text.split("\n")
-                    desc_lines = [
-                        line.strip()
-                        for line in all_lines
-                        if "|" in line
-                        and "default" in line
-                        and not re.search(r"\d{12}", line)
-                    ]
+                    if desc_lines is None:
+                        desc_lines = [
+                            line.strip()
+                            for line in lines
+                            if "|" in line
+                            and "default" in line
+                            and not _TWELVE_DIGITS_RE.search(line)
+                        ]
+                        for desc_line in desc_lines:
+                            desc_code = _DESC_CODE_RE.search(desc_line)
+                            if desc_code:
+                                desc_line_by_code.setdefault(
+                                    desc_code.group(1), desc_line
+                                )
                     if len(desc_lines) > i:
                         description = desc_lines[i]
-                    elif desc_lines:
+                    else:
                         # Fallback: try to find any unused description
-                        for desc_line in desc_lines:
-                            # Check if this description hasn't been used yet
-                            desc_code = re.search(r"#([A-Z0-9]+)", desc_line)
-                            if desc_code and desc_code.group(1) == code:
-                                description = desc_line
-                                break
+                        description = desc_line_by_code.get(code, description)
 
                 # Last resort fallback
                 if not description and descriptions:
@@ -1680,9 +2124,7 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
         # Clean up description
         if description:
             # Remove product code references to avoid duplication
-            clean_desc = re.sub(rf"\s*-\s*#{code}\s*$", "", description)
-            clean_desc = re.sub(rf"\s*#{code}\s*", "", clean_desc)
-            clean_desc = clean_desc.strip()
+            clean_desc = code_ref_re.sub("", description).strip()
 
             full_description = f"{code} - {clean_desc}"
         else:
@@ -1692,60 +2134,89 @@ def split_rifle_paper_line_item(full_line_text, entity, document_text=None):
         formatted_price = f"${price}"
 
         items.append(
-            {
-                "product_code": code,
-                "description": full_description,
-                "unit_price": formatted_price,
-                "quantity": qty,
-                "upc_code": upc,
-                "line_total": f"${total}",
-            }
+            LineItem(
+                description=full_description,
+                unit_price=formatted_price,
+                quantity=qty,
+                product_code=code,
+                upc_code=upc,
+                line_total=f"${total}",
+            )
         )
 
-        print(f"  -> Created item: {code} - {description}, ${price}, Qty: {qty}")
+        logger.debug(
+            "  -> Created item: %s - %s, $%s, Qty: %s", code, description, price, qty
+        )
 
     return items
 
 
+def is_numbers_only(text):
+    """Check whether non-empty text is only digits, whitespace and periods"""
+    digits = "".join(text.replace(".", " ").split())
+    return not digits or digits.isdecimal()
+
+
+def first_integer(text):
+    """Return the first standalone run of digits in text, or None"""
+    if text.isdecimal():
+        return text  # The usual bare quantity, no regex needed
+    match = _INTEGER_RE.search(text)
+    return match.group(1) if match else None
+
+
 def split_combined_line_item(full_line_text, entity, document_text=None):
     """Split combined line items that contain multiple products (Creative-Coop style)"""
     items = []
 
     # Pattern: Description → ProductCode → UPC → Description → ProductCode → UPC
     # Use regex to find product codes with their immediately following UPC codes (same line)
-    product_upc_pattern = r"\b(D[A-Z]\d{4}[A-Z]?)\s+(\d{12})"
-    product_upc_matches = re.findall(product_upc_pattern, full_line_text)
+    product_upc_matches = _CC_PRODUCT_UPC_RE.findall(full_line_text)
 
     # Also find product codes without UPC codes
-    all_product_codes = re.findall(r"\b(D[A-Z]\d{4}[A-Z]?)\b", full_line_text)
+    all_product_codes = _CREATIVE_COOP_CODE_RE.findall(full_line_text)
 
     # Split text by lines to find descriptions and UPC codes
     lines = full_line_text.split("\n")
 
+    # First occurrence of each product code, and the line it sits on. A code
+    # never spans a newline, so the line holding its first occurrence is also
+    # the first line containing it.
+    pos_by_code = {}
+    line_idx_by_code = {}
+    for product_code in all_product_codes:
+        if product_code not in pos_by_code:
+            product_pos = full_line_text.find(product_code)
+            pos_by_code[product_code] = product_pos
+            line_idx_by_code[product_code] = full_line_text.count("\n", 0, product_pos)
+
+    # Same-line UPC for each product code; the first pairing wins
+    upc_by_code = dict(reversed(product_upc_matches))
+
+    # Item built for each product code (None when it had no usable description)
+    item_by_code = {}
+
     # For each product code found
     for product_code in all_product_codes:
-        # Find the UPC code for this product (if any)
-        upc_code = None
+        if product_code in item_by_code:
+            # Everything below depends only on the code, so a repeated code
+            # yields the same item again without redoing the lookups
+            item = item_by_code[product_code]
+            if item is not None:
+                items.append(item)
+            continue
+
+        product_line_idx = line_idx_by_code[product_code]
 
         # First try to find UPC on same line as product code
-        for prod, upc in product_upc_matches:
-            if prod == product_code:
-                # Ensure UPC starts with 0 if it's 12 digits
-                if len(upc) == 12 and not upc.startswith("0"):
-                    upc_code = f"0{upc}"
-                else:
-                    upc_code = upc
-                break
+        upc_code = upc_by_code.get(product_code)
+        if upc_code is not None:
+            # Ensure UPC starts with 0 if it's 12 digits
+            if len(upc_code) == 12 and not upc_code.startswith("0"):
+                upc_code = f"0{upc_code}"
 
         # If no UPC found on same line, look for UPC in nearby lines within entity
         if not upc_code:
-            # Find which line contains this product code
-            product_line_idx = -1
-            for line_idx, line in enumerate(lines):
-                if product_code in line:
-                    product_line_idx = line_idx
-                    break
-
             # Look for UPC in the next few lines after the product code
             if product_line_idx != -1:
                 for search_line_idx in range(
@@ -1753,7 +2224,7 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
                 ):
                     line_text = lines[search_line_idx].strip()
                     # Look for standalone UPC codes
-                    upc_match = re.search(r"\b(\d{12,13})\b", line_text)
+                    upc_match = _UPC_CODE_RE.search(line_text)
                     if upc_match:
                         upc_candidate = upc_match.group(1)
                         # Ensure it's a valid UPC format
@@ -1773,13 +2244,6 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
         # Find the description for this product code
         description = ""
 
-        # Find which line contains this product code
-        product_line_idx = -1
-        for line_idx, line in enumerate(lines):
-            if product_code in line:
-                product_line_idx = line_idx
-                break
-
         # Look for description - could be in several places
 
         # Case 1: FIRST try description on the same line as the product code (after the product code)
@@ -1796,9 +2260,7 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
                 # Extract description pattern (everything before pricing info)
                 # Look for patterns like "S/4 18" Sq Cotton Embroidered Napkins, Tied w Twill Tape"
                 # followed by numbers that indicate pricing/quantity (like "8 0 each")
-                desc_match = re.search(
-                    r"^\s*(.+?)(?:\s+\d+\s+\d+\s+(?:each|lo|Set)|\s+TRF)", after_product
-                )
+                desc_match = _CC_SAME_LINE_DESC_RE.search(after_product)
                 if desc_match:
                     candidate_desc = desc_match.group(1).strip()
                     if len(candidate_desc) > 10:
@@ -1821,31 +2283,21 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
                 product_line_idx + 1, min(len(lines), product_line_idx + 4)
             ):
                 candidate_line = lines[desc_line_idx].strip()
-                # Skip UPC codes and numeric-only lines
-                if (
-                    candidate_line
-                    and not re.match(r"^\d{12,13}$", candidate_line)  # Not UPC
-                    and not re.match(r"^[\d\s\.]+$", candidate_line)  # Not just numbers
-                    and len(candidate_line) > 10
-                ):  # Substantial length
+                # Need a substantial length; skip UPC codes and numeric-only
+                # lines (a UPC is numeric-only too)
+                if len(candidate_line) > 10 and not is_numbers_only(candidate_line):
                     description = candidate_line
                     break
 
         # If still no good description found, try other methods
         if not description or len(description) < 5:
             # Look for description patterns around this product code
-            product_pos = full_line_text.find(product_code)
+            product_pos = pos_by_code[product_code]
             if product_pos > 0:
-                # Look backward for a description
-                before_text = full_line_text[:product_pos]
-                desc_patterns = [
-                    r"([^\n]{15,})\s*$",  # Last line before product code
-                    r'(\d+["\'-]\d+["\']?[LWH]?\s+[^\n]{10,})',  # Dimension descriptions
-                    r"(S/\d+\s+[^\n]{10,})",  # Set descriptions
-                ]
-
-                for pattern in desc_patterns:
-                    matches = re.findall(pattern, before_text)
+                # Look backward for a description; endpos stands in for slicing
+                # off the text before the product code
+                for pattern in _CC_BEFORE_DESC_PATTERNS:
+                    matches = pattern.findall(full_line_text, 0, product_pos)
                     if matches:
                         candidate = matches[-1].strip()  # Get the last/closest match
                         if len(candidate) > 5:
@@ -1865,22 +2317,23 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
                 quantity = creative_coop_qty
 
         # Fallback to entity properties for unit price
-        if hasattr(entity, "properties") and entity.properties:
-            for prop in entity.properties:
-                if prop.type_ == "line_item/unit_price":
-                    unit_price = clean_price(prop.mention_text)
-                elif prop.type_ == "line_item/quantity" and not quantity:
-                    # Only use entity quantity if Creative-Coop extraction failed
-                    qty_text = prop.mention_text.strip()
-                    qty_match = re.search(r"\b(\d+(?:\.\d+)?)\b", qty_text)
-                    if qty_match:
-                        qty_value = float(qty_match.group(1))
-                        if qty_value == int(qty_value):
-                            quantity = str(int(qty_value))
-                        else:
-                            quantity = str(qty_value)
+        for prop in entity.properties:
+            prop_type = prop.type_
+            if prop_type == "line_item/unit_price":
+                unit_price = clean_price(prop.mention_text)
+            elif prop_type == "line_item/quantity" and not quantity:
+                # Only use entity quantity if Creative-Coop extraction failed
+                qty_text = prop.mention_text.strip()
+                qty_match = _QUANTITY_VALUE_RE.search(qty_text)
+                if qty_match:
+                    qty_value = float(qty_match.group(1))
+                    if qty_value == int(qty_value):
+                        quantity = str(int(qty_value))
+                    else:
+                        quantity = str(qty_value)
 
         # If we found a good description, add this item
+        item = None
         if description and len(description) > 3:
             clean_description = clean_item_description(
                 description, product_code, upc_code
@@ -1893,62 +2346,33 @@ def split_combined_line_item(full_line_text, entity, document_text=None):
             else:
                 formatted_description = f"{product_code} - {clean_description}"
 
-            items.append(
-                {
-                    "description": formatted_description,
-                    "unit_price": unit_price if unit_price else "$0.00",
-                    "quantity": quantity,
-                }
+            item = LineItem(
+                description=formatted_description,
+                unit_price=unit_price if unit_price else "$0.00",
+                quantity=quantity,
             )
+            items.append(item)
+        item_by_code[product_code] = item
 
     return items
 
 
+@functools.lru_cache(maxsize=8)
 def detect_vendor_type(document_text):
     """Detect the vendor type based on document content"""
-    # Check for HarperCollins indicators
-    harpercollins_indicators = [
-        "HarperCollins",
-        "Harper Collins",
-        "MFR: HarperCollins",
-        "Anne McGilvray & Company",  # Distributor for HarperCollins
-    ]
-
-    for indicator in harpercollins_indicators:
-        if indicator.lower() in document_text.lower():
-            return "HarperCollins"
-
-    # Check for Creative-Coop indicators
-    creative_coop_indicators = [
-        "Creative Co-op",
-        "creativeco-op",
-        "Creative Co-Op",
-        "Creative Coop",
-    ]
-
-    for indicator in creative_coop_indicators:
-        if indicator.lower() in document_text.lower():
-            return "Creative-Coop"
-
-    # Check for OneHundred80 indicators
-    onehundred80_indicators = [
-        "One Hundred 80 Degrees",
-        "OneHundred80",
-        "One Hundred80",
-        "onehundred80degrees.com",
-    ]
-
-    for indicator in onehundred80_indicators:
-        if indicator.lower() in document_text.lower():
-            return "OneHundred80"
+    # Lowercase the text once and check each vendor's indicators in priority order
+    text_lower = document_text.lower()
+    for vendor_type, indicators in _VENDOR_INDICATORS:
+        for indicator in indicators:
+            if indicator in text_lower:
+                return vendor_type
 
     return "Generic"
 
 
 def extract_discount_percentage(document_text):
     """Extract discount percentage from text like 'Discount: 50.00% OFF'"""
-    discount_pattern = r"Discount:\s*(\d+(?:\.\d+)?)%\s*OFF"
-    match = re.search(discount_pattern, document_text, re.IGNORECASE)
+    match = _DISCOUNT_RE.search(document_text)
     if match:
         return float(match.group(1)) / 100.0
     return None
@@ -1956,109 +2380,128 @@ def extract_discount_percentage(document_text):
 
 def extract_order_number_improved(document_text):
     """Extract order number from patterns like 'NS4435067'"""
-    order_patterns = [r"(NS\d+)", r"PO #\s*([A-Z]+\d+)", r"Order #\s*([A-Z]+\d+)"]
+    # One scan finds the earliest match of any pattern (each has one group, so
+    # lastindex names it). A higher-priority pattern can still win, but only
+    # with a match that starts after this one.
+    match = _IMPROVED_ORDER_NUMBER_RE.search(document_text)
+    if not match:
+        return ""
 
-    for pattern in order_patterns:
-        match = re.search(pattern, document_text, re.IGNORECASE)
-        if match:
-            return match.group(1)
+    for pattern in _IMPROVED_ORDER_NUMBER_PATTERNS[: match.lastindex - 1]:
+        better = pattern.search(document_text, match.start() + 1)
+        if better:
+            return better.group(1)
 
-    return ""
+    return match.group(match.lastindex)
 
 
 def extract_order_date_improved(document_text):
     """Extract order date from patterns like 'Order Date: 04/29/2025'"""
-    date_pattern = r"Order Date:\s*(\d{1,2}/\d{1,2}/\d{4})"
-    match = re.search(date_pattern, document_text, re.IGNORECASE)
+    match = _ORDER_DATE_IMPROVED_RE.search(document_text)
     if match:
         date_str = match.group(1)
-        try:
-            parsed = datetime.strptime(date_str, "%m/%d/%Y")
-            return parsed.strftime("%m/%d/%y")
-        except ValueError:
+        if not date_str.isascii():
+            try:
+                parsed = datetime.strptime(date_str, "%m/%d/%Y")
+                return parsed.strftime("%m/%d/%y")
+            except ValueError:
+                return date_str
+
+        # Reformat to MM/DD/YY directly, keeping the original text if it is
+        # not a real calendar date
+        month, day, year = map(int, match.group("month", "day", "year"))
+        if not 1 <= month <= 12 or year < 1:
+            return date_str
+        if not 1 <= day <= calendar.monthrange(year, month)[1]:
             return date_str
+        return f"{month:02d}/{day:02d}/{year % 100:02d}"
     return ""
 
 
+# HarperCollins list prices and quantities keyed by ISBN, built once at import
+_HARPERCOLLINS_BOOK_DATA = {
+    "9780001839236": {"title": "Summer Story", "price": 9.99, "qty": 3},
+    "9780008547110": {
+        "title": "Brambly Hedge Pop-Up Book, The",
+        "price": 29.99,
+        "qty": 3,
+    },
+    "9780062645425": {"title": "Pleasant Fieldmouse", "price": 24.99, "qty": 3},
+    "9780062883124": {
+        "title": "Frog and Toad Storybook Favorites",
+        "price": 16.99,
+        "qty": 3,
+    },
+    "9780062916570": {"title": "Wild and Free Nature", "price": 22.99, "qty": 3},
+    "9780063090002": {
+        "title": "Plant the Tiny Seed Board Book",
+        "price": 9.99,
+        "qty": 3,
+    },
+    "9780063424500": {"title": "Kiss for Little Bear, A", "price": 17.99, "qty": 3},
+    "9780064435260": {"title": "Little Prairie House, A", "price": 9.99, "qty": 3},
+    "9780544066656": {"title": "Jack and the Beanstalk", "price": 12.99, "qty": 2},
+    "9780544880375": {"title": "Rain! Board Book", "price": 7.99, "qty": 3},
+    "9780547370187": {"title": "Little Red Hen, The", "price": 12.99, "qty": 2},
+    "9780547370194": {"title": "Three Bears, The", "price": 12.99, "qty": 2},
+    "9780547370200": {"title": "Three Little Pigs, The", "price": 12.99, "qty": 2},
+    "9780547449272": {"title": "Tons of Trucks", "price": 13.99, "qty": 3},
+    "9780547668550": {"title": "Little Red Riding Hood", "price": 12.99, "qty": 2},
+    "9780694003617": {
+        "title": "Goodnight Moon Board Book",
+        "price": 10.99,
+        "qty": 3,
+    },
+    "9780694006380": {
+        "title": "My Book of Little House Paper Dolls",
+        "price": 14.99,
+        "qty": 3,
+    },
+    "9780694006519": {"title": "Jamberry Board Book", "price": 9.99, "qty": 3},
+    "9780694013203": {
+        "title": "Grouchy Ladybug Board Book, The",
+        "price": 9.99,
+        "qty": 3,
+    },
+    "9781805074182": {
+        "title": "Drawing, Doodling and Coloring Activity Book Usbor",
+        "price": 6.99,
+        "qty": 3,
+    },
+    "9781805078913": {
+        "title": "Little Sticker Dolly Dressing Puppies Usborne",
+        "price": 8.99,
+        "qty": 3,
+    },
+    "9781836050278": {
+        "title": "Little Sticker Dolly Dressing Fairy Usborne",
+        "price": 8.99,
+        "qty": 3,
+    },
+    "9781911641100": {"title": "Place Called Home, A", "price": 45.00, "qty": 2},
+}
+
+
 def get_harpercollins_book_data():
-    """Return HarperCollins book data mapping"""
-    return {
-        "9780001839236": {"title": "Summer Story", "price": 9.99, "qty": 3},
-        "9780008547110": {
-            "title": "Brambly Hedge Pop-Up Book, The",
-            "price": 29.99,
-            "qty": 3,
-        },
-        "9780062645425": {"title": "Pleasant Fieldmouse", "price": 24.99, "qty": 3},
-        "9780062883124": {
-            "title": "Frog and Toad Storybook Favorites",
-            "price": 16.99,
-            "qty": 3,
-        },
-        "9780062916570": {"title": "Wild and Free Nature", "price": 22.99, "qty": 3},
-        "9780063090002": {
-            "title": "Plant the Tiny Seed Board Book",
-            "price": 9.99,
-            "qty": 3,
-        },
-        "9780063424500": {"title": "Kiss for Little Bear, A", "price": 17.99, "qty": 3},
-        "9780064435260": {"title": "Little Prairie House, A", "price": 9.99, "qty": 3},
-        "9780544066656": {"title": "Jack and the Beanstalk", "price": 12.99, "qty": 2},
-        "9780544880375": {"title": "Rain! Board Book", "price": 7.99, "qty": 3},
-        "9780547370187": {"title": "Little Red Hen, The", "price": 12.99, "qty": 2},
-        "9780547370194": {"title": "Three Bears, The", "price": 12.99, "qty": 2},
-        "9780547370200": {"title": "Three Little Pigs, The", "price": 12.99, "qty": 2},
-        "9780547449272": {"title": "Tons of Trucks", "price": 13.99, "qty": 3},
-        "9780547668550": {"title": "Little Red Riding Hood", "price": 12.99, "qty": 2},
-        "9780694003617": {
-            "title": "Goodnight Moon Board Book",
-            "price": 10.99,
-            "qty": 3,
-        },
-        "9780694006380": {
-            "title": "My Book of Little House Paper Dolls",
-            "price": 14.99,
-            "qty": 3,
-        },
-        "9780694006519": {"title": "Jamberry Board Book", "price": 9.99, "qty": 3},
-        "9780694013203": {
-            "title": "Grouchy Ladybug Board Book, The",
-            "price": 9.99,
-            "qty": 3,
-        },
-        "9781805074182": {
-            "title": "Drawing, Doodling and Coloring Activity Book Usbor",
-            "price": 6.99,
-            "qty": 3,
-        },
-        "9781805078913": {
-            "title": "Little Sticker Dolly Dressing Puppies Usborne",
-            "price": 8.99,
-            "qty": 3,
-        },
-        "9781836050278": {
-            "title": "Little Sticker Dolly Dressing Fairy Usborne",
-            "price": 8.99,
-            "qty": 3,
-        },
-        "9781911641100": {"title": "Place Called Home, A", "price": 45.00, "qty": 2},
-    }
+    """Return HarperCollins book data mapping (shared; do not modify)"""
+    return _HARPERCOLLINS_BOOK_DATA
 
 
 def process_harpercollins_document(document):
     """Process HarperCollins documents with perfect formatting"""
 
     # Fixed values for HarperCollins
-    order_date = extract_order_date_improved(document.text)
+    document_text = document.text
+    order_date = extract_order_date_improved(document_text)
     if not order_date:
         order_date = "04/29/25"  # Default fallback
 
     vendor = "HarperCollins"
-    order_number = extract_order_number_improved(document.text)
+    order_number = extract_order_number_improved(document_text)
     if not order_number:
         order_number = "NS4435067"  # Default fallback
 
-    discount = extract_discount_percentage(document.text)
+    discount = extract_discount_percentage(document_text)
     if not discount:
         discount = 0.5  # Default 50% for HarperCollins
 
@@ -2069,59 +2512,88 @@ def process_harpercollins_document(document):
     # Get book data
     book_data = get_harpercollins_book_data()
 
-    # Extract ISBNs from the document
-    found_isbns = set()
-    for entity in document.entities:
-        if entity.type_ == "line_item":
-            if hasattr(entity, "properties") and entity.properties:
-                for prop in entity.properties:
-                    if prop.type_ == "line_item/product_code":
-                        isbn = prop.mention_text.strip()
-                        if isbn in book_data:
-                            found_isbns.add(isbn)
+    # Extract ISBNs from the line item product codes, keeping the known ones
+    found_isbns = book_data.keys() & {
+        prop.mention_text.strip()
+        for entity in document.entities
+        if entity.type_ == "line_item"
+        for prop in entity.properties
+        if prop.type_ == "line_item/product_code"
+    }
 
     print(f"Found {len(found_isbns)} matching ISBNs in document")
 
     # Create rows for found ISBNs only
     rows = []
     for isbn in sorted(found_isbns):
-        if isbn in book_data:
-            data = book_data[isbn]
-            list_price = data["price"]
-            wholesale_price = list_price * discount
-            quantity = data["qty"]
-            title = data["title"]
-
-            # Format exactly like expected: ISBN - Title
-            description = f"{isbn} - {title}"
-
-            # Format price with proper decimals
-            if wholesale_price == int(wholesale_price):
-                price_str = str(int(wholesale_price))
-            else:
-                price_str = f"{wholesale_price:.3f}"
-
-            rows.append(
-                [
-                    "",  # Column A (blank)
-                    order_date,  # Column B
-                    vendor,  # Column C
-                    order_number,  # Column D
-                    description,  # Column E
-                    price_str,  # Column F
-                    str(quantity),  # Column G
-                ]
-            )
+        data = book_data[isbn]
+        list_price = data["price"]
+        wholesale_price = list_price * discount
+        quantity = data["qty"]
+        title = data["title"]
+
+        # Format exactly like expected: ISBN - Title
+        description = f"{isbn} - {title}"
+
+        # Format price with proper decimals
+        if wholesale_price == int(wholesale_price):
+            price_str = str(int(wholesale_price))
+        else:
+            price_str = f"{wholesale_price:.3f}"
+
+        rows.append(
+            [
+                "",  # Column A (blank)
+                order_date,  # Column B
+                vendor,  # Column C
+                order_number,  # Column D
+                description,  # Column E
+                price_str,  # Column F
+                str(quantity),  # Column G
+            ]
+        )
 
     return rows
 
 
+def find_creative_coop_wholesale(numbers):
+    """Find (ordered_qty, wholesale_price) in a Creative-Coop entity's numbers
+
+    Looks for the format: product_code qty other_qty unit price1 price2 amount,
+    where the wholesale price is the lower of two adjacent decimal prices.
+    Returns None when no such price pair exists.
+    """
+    # Each quantity candidate at index i only looks for prices at i+2..i+5, so
+    # the first hit is always the earliest qualifying price pair at index >= 2,
+    # paired with the number up to five positions before it. One scan over
+    # the pairs finds it without trying every quantity start.
+    for j in range(2, len(numbers) - 2):
+        unit_price, wholesale = numbers[j], numbers[j + 1]
+        if "." in unit_price and "." in wholesale:
+            price1 = float(unit_price)
+            price2 = float(wholesale)
+
+            # Wholesale should be lower than unit price
+            if price2 < price1 and price2 > 0:
+                return int(float(numbers[max(0, j - 5)])), price2
+    return None
+
+
 def process_creative_coop_document(document):
     """Process Creative-Coop documents with comprehensive wholesale prices and ordered quantities"""
 
     # Extract basic invoice info
-    entities = {e.type_: e.mention_text for e in document.entities}
-    vendor = extract_best_vendor(document.entities)
+    document_entities = document.entities
+    # Collect header fields and line items in a single pass over the entities
+    entities = {}
+    line_items = []
+    for entity in document_entities:
+        entity_type = entity.type_
+        if entity_type == "line_item":
+            line_items.append((entity, entity.mention_text))
+        else:
+            entities[entity_type] = entity.mention_text
+    vendor = extract_best_vendor(document_entities)
     invoice_number = entities.get("invoice_id", "")
     invoice_date = format_date(entities.get("invoice_date", ""))
 
@@ -2137,120 +2609,118 @@ def process_creative_coop_document(document):
     all_product_data = {}
 
     # Step 1: Extract all pricing and quantity data for each product
-    for entity in document.entities:
-        if entity.type_ == "line_item":
-            entity_text = entity.mention_text
-            product_codes = re.findall(r"\b(D[A-Z]\d{4}[A-Z]?)\b", entity_text)
-
-            if not product_codes:
-                continue
+    # Find every line item's product codes in one scan of their joined texts.
+    # Codes never span a newline, and a newline separator gives the same word
+    # boundaries as the start and end of each text.
+    codes_by_item = [[] for _ in line_items]
+    item_ends = list(itertools.accumulate(len(text) + 1 for _, text in line_items))
+    joined_text = "\n".join(text for _, text in line_items)
+    bisect_right = bisect.bisect_right
+    for match in _CREATIVE_COOP_CODE_RE.finditer(joined_text):
+        item_idx = bisect_right(item_ends, match.start())
+        codes_by_item[item_idx].append(match.group(1))
+
+    # The per-entity pattern methods, looked up once for the whole loop
+    find_numbers = _CC_NUMBER_RE.findall
+    search_price1 = _CC_PRICE_PATTERN1.search
+    finditer_price2 = _CC_PRICE_PATTERN2.finditer
+
+    for (entity, entity_text), product_codes in zip(line_items, codes_by_item):
+        if not product_codes:
+            continue
 
-            # Extract all numerical values from this entity
-            numbers = re.findall(r"\b\d+(?:\.\d{1,2})?\b", entity_text)
-
-            # Look for Creative-Coop patterns for each product in this entity
-            for product_code in product_codes:
-                if product_code not in all_product_data:
-                    all_product_data[product_code] = {
-                        "entity_text": entity_text,
-                        "ordered_qty": "0",
-                        "wholesale_price": "",
-                        "found_in_entity": True,
-                    }
+        # The price patterns only look at the entity text, so match them once
+        # per entity rather than once per product code. Patterns 2 and 3 are
+        # only needed when the earlier ones fail, so they run on first use.
+        # Pattern 1 always validates: the ordered quantity is never negative.
+        price_match1 = search_price1(entity_text)
+        price_match2 = None
+        price_match2_searched = False
+        numbers_wholesale = None
+        wholesale_searched = False
+
+        # Look for Creative-Coop patterns for each product in this entity
+        for product_code in product_codes:
+            product_data = all_product_data.get(product_code)
+            if product_data is None:
+                product_data = all_product_data[product_code] = {
+                    "entity_text": entity_text,
+                    "ordered_qty": "0",
+                    "wholesale_price": "",
+                    "found_in_entity": True,
+                }
 
-                # Pattern 1: Standard "ordered back unit unit_price wholesale amount" format
-                pattern1 = r"(\d+)\s+(\d+)\s+(?:lo\s+)?(?:each|Set)\s+(\d+\.\d{2})\s+(\d+\.\d{2})\s+(\d+\.\d{2})"
-                matches1 = re.findall(pattern1, entity_text, re.IGNORECASE)
-
-                for match in matches1:
-                    ordered, back, unit_price, wholesale, amount = match
-                    ordered_int = int(ordered)
-
-                    # Validate this is a reasonable match
-                    if ordered_int >= 0:  # Include 0 quantities
-                        all_product_data[product_code]["ordered_qty"] = ordered
-                        all_product_data[product_code][
-                            "wholesale_price"
-                        ] = f"${wholesale}"
-                        print(
-                            f"✓ Pattern 1 for {product_code}: ordered={ordered}, wholesale=${wholesale}"
-                        )
-                        break
+            # Pattern 1: Standard "ordered back unit unit_price wholesale amount" format
+            if price_match1:
+                ordered, wholesale = price_match1.group(1, 4)
+                product_data["ordered_qty"] = ordered
+                product_data["wholesale_price"] = f"${wholesale}"
+                logger.debug(
+                    "✓ Pattern 1 for %s: ordered=%s, wholesale=$%s",
+                    product_code,
+                    ordered,
+                    wholesale,
+                )
 
-                # Pattern 2: Handle cases where wholesale appears later in the text
-                if not all_product_data[product_code]["wholesale_price"]:
+            # Pattern 2: Handle cases where wholesale appears later in the text
+            if not product_data["wholesale_price"]:
+                if not price_match2_searched:
                     # Look for pattern where we have: qty back unit unit_price ... wholesale amount
-                    pattern2 = r"(\d+)\s+(\d+)\s+(?:lo\s+)?(?:each|Set)\s+(\d+\.\d{2}).*?(\d+\.\d{2})\s+(\d+\.\d{2})"
-                    matches2 = re.findall(pattern2, entity_text, re.IGNORECASE)
-
-                    for match in matches2:
-                        ordered, back, unit_price, potential_wholesale, amount = match
-                        ordered_int = int(ordered)
+                    # and the wholesale price is reasonable (less than unit price)
+                    price_match2 = next(
+                        (
+                            match
+                            for match in finditer_price2(entity_text)
+                            if float(match[4]) <= float(match[3])
+                        ),
+                        None,
+                    )
+                    price_match2_searched = True
+
+                if price_match2:
+                    ordered, potential_wholesale = price_match2.group(1, 4)
+                    product_data["ordered_qty"] = ordered
+                    product_data["wholesale_price"] = f"${potential_wholesale}"
+                    logger.debug(
+                        "✓ Pattern 2 for %s: ordered=%s, wholesale=$%s",
+                        product_code,
+                        ordered,
+                        potential_wholesale,
+                    )
 
-                        # Validate wholesale price is reasonable (less than unit price)
-                        if ordered_int >= 0 and float(potential_wholesale) <= float(
-                            unit_price
-                        ):
-                            all_product_data[product_code]["ordered_qty"] = ordered
-                            all_product_data[product_code][
-                                "wholesale_price"
-                            ] = f"${potential_wholesale}"
-                            print(
-                                f"✓ Pattern 2 for {product_code}: ordered={ordered}, wholesale=${potential_wholesale}"
-                            )
-                            break
+            # Pattern 3: Handle special cases with different ordering
+            if not product_data["wholesale_price"]:
+                if not wholesale_searched:
+                    # Extract all numerical values from this entity
+                    numbers = find_numbers(entity_text)
+                    numbers_wholesale = find_creative_coop_wholesale(numbers)
+                    wholesale_searched = True
+
+                if numbers_wholesale:
+                    potential_ordered, price2 = numbers_wholesale
+                    product_data["ordered_qty"] = str(potential_ordered)
+                    product_data["wholesale_price"] = f"${price2:.2f}"
+                    logger.debug(
+                        "✓ Pattern 3 for %s: ordered=%s, wholesale=$%.2f",
+                        product_code,
+                        potential_ordered,
+                        price2,
+                    )
 
-                # Pattern 3: Handle special cases with different ordering
-                if not all_product_data[product_code]["wholesale_price"]:
-                    # Some entities might have the format: product_code qty other_qty unit price1 price2 amount
-                    # where we need to determine which price is wholesale
-                    if len(numbers) >= 5:
-                        try:
-                            # Try different combinations to find ordered qty and wholesale price
-                            for i in range(len(numbers) - 4):
-                                potential_ordered = int(float(numbers[i]))
-                                if potential_ordered >= 0:
-                                    # Look for two prices after this
-                                    for j in range(i + 2, min(len(numbers) - 2, i + 6)):
-                                        if "." in numbers[j] and "." in numbers[j + 1]:
-                                            price1 = float(numbers[j])
-                                            price2 = float(numbers[j + 1])
-
-                                            # Wholesale should be lower than unit price
-                                            if price2 < price1 and price2 > 0:
-                                                all_product_data[product_code][
-                                                    "ordered_qty"
-                                                ] = str(potential_ordered)
-                                                all_product_data[product_code][
-                                                    "wholesale_price"
-                                                ] = f"${price2:.2f}"
-                                                print(
-                                                    f"✓ Pattern 3 for {product_code}: ordered={potential_ordered}, wholesale=${price2:.2f}"
-                                                )
-                                                break
-                                    if all_product_data[product_code][
-                                        "wholesale_price"
-                                    ]:
-                                        break
-                        except (ValueError, IndexError):
-                            continue
-
-                # Fallback: Use Document AI properties if available
-                if not all_product_data[product_code]["wholesale_price"] and hasattr(
-                    entity, "properties"
-                ):
-                    for prop in entity.properties:
-                        if prop.type_ == "line_item/unit_price":
-                            all_product_data[product_code]["wholesale_price"] = (
-                                clean_price(prop.mention_text)
-                            )
-                        elif prop.type_ == "line_item/quantity":
-                            qty_text = prop.mention_text.strip()
-                            qty_match = re.search(r"\b(\d+)\b", qty_text)
-                            if qty_match:
-                                all_product_data[product_code]["ordered_qty"] = (
-                                    qty_match.group(1)
-                                )
+            # Fallback: Use Document AI properties if available
+            if not all_product_data[product_code]["wholesale_price"] and hasattr(
+                entity, "properties"
+            ):
+                for prop in entity.properties:
+                    prop_type = prop.type_
+                    if prop_type == "line_item/unit_price":
+                        all_product_data[product_code]["wholesale_price"] = clean_price(
+                            prop.mention_text
+                        )
+                    elif prop_type == "line_item/quantity":
+                        qty = first_integer(prop.mention_text.strip())
+                        if qty:
+                            all_product_data[product_code]["ordered_qty"] = qty
 
     # Step 2: Create rows for all products found in mappings
     print(f"\n=== Creating final output for all products ===")
@@ -2291,10 +2761,15 @@ def process_creative_coop_document(document):
                     ordered_qty,
                 ]
             )
-            print(f"✓ Added {product_code}: {wholesale_price} | Qty: {ordered_qty}")
+            logger.debug(
+                "✓ Added %s: %s | Qty: %s", product_code, wholesale_price, ordered_qty
+            )
         else:
-            print(
-                f"- Skipped {product_code}: {wholesale_price} | Qty: {ordered_qty} (zero quantity)"
+            logger.debug(
+                "- Skipped %s: %s | Qty: %s (zero quantity)",
+                product_code,
+                wholesale_price,
+                ordered_qty,
             )
 
     print(f"Creative-Coop processing completed: {len(rows)} items with ordered qty > 0")
@@ -2315,17 +2790,29 @@ def extract_creative_coop_product_mappings_corrected(document_text):
         table_start = 0
 
     # Get a substantial portion that includes all products - expand to capture all items
-    table_section = document_text[table_start : table_start + 8000]
-
-    # Find all UPCs and product codes with positions
-    upc_pattern = r"\b(\d{12})\b"
-    product_pattern = r"\b(D[A-Z]\d{4}[A-Z]?)\b"
-
-    upc_matches = list(re.finditer(upc_pattern, table_section))
-    product_matches = list(re.finditer(product_pattern, table_section))
+    # The section is scanned in place with pos/endpos, so match positions are
+    # offsets into document_text. No match can start at table_start itself
+    # (it is either 0 or the "E" of "Extended"), so word boundaries agree
+    # with scanning a copy of the section.
+    table_end = min(len(document_text), table_start + 8000)
+
+    # Find all UPCs and product codes with positions, as parallel start and
+    # value lists in text order
+    upc_starts = []
+    upc_codes = []
+    for match in twelve_digit_upc_pattern(document_text).finditer(
+        document_text, table_start, table_end
+    ):
+        upc_starts.append(match.start())
+        upc_codes.append(match.group(1))
+    product_starts = []
+    product_codes = []
+    for match in _CREATIVE_COOP_CODE_RE.finditer(document_text, table_start, table_end):
+        product_starts.append(match.start())
+        product_codes.append(match.group(1))
 
     print(
-        f"Creative-Coop mapping: Found {len(upc_matches)} UPCs, {len(product_matches)} products"
+        f"Creative-Coop mapping: Found {len(upc_starts)} UPCs, {len(product_starts)} products"
     )
 
     mappings = {}
@@ -2333,40 +2820,20 @@ def extract_creative_coop_product_mappings_corrected(document_text):
     # The key insight: UPC[i] and Description[i] belong to Product[i], not Product[i+1]
     # So we need to find the NEXT UPC/description after each product, not the previous one
 
-    for i, product_match in enumerate(product_matches):
-        product_code = product_match.group(1)
-        product_pos = product_match.start()
-
-        # For each product, find the NEXT UPC and description that come after it
-        target_upc = None
-        target_description = None
-
-        # Find the next UPC after this product
-        for upc_match in upc_matches:
-            upc_pos = upc_match.start()
-            if upc_pos > product_pos:  # UPC comes AFTER product
-                target_upc = f"0{upc_match.group(1)}"  # Add leading zero
-
-                # Find description between this UPC and the next product (if any)
-                next_product_pos = None
-                if i + 1 < len(product_matches):
-                    next_product_pos = product_matches[i + 1].start()
-                else:
-                    next_product_pos = len(table_section)
-
-                # Extract description between UPC and next product
-                desc_text = table_section[upc_pos + 12 : next_product_pos]
-                target_description = extract_description_from_between_text(desc_text)
-                break
+    # Each product's description ends where the next product starts
+    next_product_starts = product_starts[1:] + [table_end]
 
+    for i, (product_code, product_pos, next_product_pos) in enumerate(
+        zip(product_codes, product_starts, next_product_starts)
+    ):
         # Special handling for the first product (DA4315)
         # It should get the very first UPC and description in the table
-        if i == 0 and len(upc_matches) > 0:
-            first_upc = f"0{upc_matches[0].group(1)}"
-            first_upc_pos = upc_matches[0].start()
+        if i == 0 and len(upc_starts) > 0:
+            first_upc = "0" + upc_codes[0]
+            first_upc_pos = upc_starts[0]
 
             # Description between first UPC and first product
-            first_desc_text = table_section[first_upc_pos + 12 : product_pos]
+            first_desc_text = document_text[first_upc_pos + 12 : product_pos]
             first_description = extract_description_from_between_text(first_desc_text)
 
             if first_description:
@@ -2374,18 +2841,40 @@ def extract_creative_coop_product_mappings_corrected(document_text):
                     "upc": first_upc,
                     "description": first_description,
                 }
-                print(
-                    f"✓ {product_code}: UPC={first_upc}, Desc='{first_description[:50]}{'...' if len(first_description) > 50 else ''}'"
+                logger.debug(
+                    "✓ %s: UPC=%s, Desc='%.50s%s'",
+                    product_code,
+                    first_upc,
+                    first_description,
+                    "..." if len(first_description) > 50 else "",
                 )
                 continue
 
+        # For each product, find the NEXT UPC and description that come after it
+        target_upc = None
+        target_description = None
+
+        # Find the next UPC after this product
+        upc_idx = bisect.bisect_right(upc_starts, product_pos)
+        if upc_idx < len(upc_starts):  # UPC comes AFTER product
+            upc_pos = upc_starts[upc_idx]
+            target_upc = "0" + upc_codes[upc_idx]  # Add leading zero
+
+            # Extract description between UPC and next product
+            desc_text = document_text[upc_pos + 12 : next_product_pos]
+            target_description = extract_description_from_between_text(desc_text)
+
         if target_upc and target_description:
             mappings[product_code] = {
                 "upc": target_upc,
                 "description": target_description,
             }
-            print(
-                f"✓ {product_code}: UPC={target_upc}, Desc='{target_description[:50]}{'...' if len(target_description) > 50 else ''}'"
+            logger.debug(
+                "✓ %s: UPC=%s, Desc='%.50s%s'",
+                product_code,
+                target_upc,
+                target_description,
+                "..." if len(target_description) > 50 else "",
             )
 
     print(f"Extracted {len(mappings)} Creative-Coop product mappings algorithmically")
@@ -2398,63 +2887,39 @@ def extract_description_from_between_text(text):
     # Clean the text
     text = text.strip()
 
-    # Split by common delimiters
-    lines = re.split(r"[\n|]+", text)
+    # Split by common delimiters (runs of them leave empty lines, which both
+    # loops below skip)
+    lines = text.translate(_PIPE_TO_NEWLINE).split("\n")
 
-    candidates = []
+    # Keep the longest candidate as it's likely the most complete description
+    # (the first one on ties)
+    best_candidate = ""
+    best_len = 0
     for line in lines:
         line = line.strip()
+        line_len = len(line)
+        if line_len <= best_len:
+            continue  # Can't beat the current best
 
         # Good description characteristics:
         # - Contains quotes (dimensions) or descriptive words
         # - Not just numbers or table formatting
         # - Reasonable length
-        if (
-            line
-            and len(line) > 10
-            and not re.match(r"^[\d\s\.\-]+$", line)  # Not just numbers
-            and not line.lower()
-            in [
-                "customer",
-                "item",
-                "shipped",
-                "back",
-                "ordered",
-                "um",
-                "list",
-                "price",
-                "truck",
-                "your",
-                "extended",
-                "amount",
-            ]
-            and (
-                '"' in line
-                or any(
-                    word in line.lower()
-                    for word in [
-                        "cotton",
-                        "stoneware",
-                        "frame",
-                        "pillow",
-                        "glass",
-                        "wood",
-                        "resin",
-                    ]
-                )
-            )
-        ):
-
-            candidates.append(line)
+        if line_len > 10 and not _NUMERIC_DASH_LINE_RE.match(line):  # Not just numbers
+            line_lower = line.lower()
+            if line_lower not in _TABLE_HEADER_WORDS and (
+                '"' in line or _DESCRIPTION_KEYWORD_RE.search(line_lower)
+            ):
+                best_candidate = line
+                best_len = line_len
 
-    if candidates:
-        # Return the longest candidate as it's likely the most complete description
-        return max(candidates, key=len)
+    if best_candidate:
+        return best_candidate
 
     # Fallback: return the first non-empty, non-numeric line
     for line in lines:
         line = line.strip()
-        if line and len(line) > 5 and not re.match(r"^[\d\s\.\-]+$", line):
+        if line and len(line) > 5 and not _NUMERIC_DASH_LINE_RE.match(line):
             return line
 
     return ""
@@ -2464,23 +2929,32 @@ def process_onehundred80_document(document):
     """Process OneHundred80 documents with correct date, invoice number, and UPC codes"""
 
     # Extract basic invoice info
-    entities = {e.type_: e.mention_text for e in document.entities}
-    vendor = extract_best_vendor(document.entities)
+    document_text = document.text
+    document_entities = document.entities
+    # Collect header fields and line items in a single pass over the entities
+    entities = {}
+    line_items = []
+    for entity in document_entities:
+        entity_type = entity.type_
+        if entity_type == "line_item":
+            line_items.append(entity)
+        else:
+            entities[entity_type] = entity.mention_text
+    vendor = extract_best_vendor(document_entities)
     purchase_order = entities.get("purchase_order", "")
 
-    # Extract order date from document text - look for patterns like "01/17/2025"
+    # Extract order date from document text - look for patterns like "01/17/2025".
+    # As in extract_order_number_improved, one scan finds the earliest match
+    # and only a higher-priority pattern matching after it can override it.
     order_date = ""
-    date_patterns = [
-        r"Order Date[:\s]+(\d{1,2}/\d{1,2}/\d{4})",
-        r"Date[:\s]+(\d{1,2}/\d{1,2}/\d{4})",
-        r"(\d{1,2}/\d{1,2}/\d{4})",
-    ]
-
-    for pattern in date_patterns:
-        match = re.search(pattern, document.text, re.IGNORECASE)
-        if match:
-            order_date = match.group(1)
-            break
+    match = _O180_DATE_RE.search(document_text)
+    if match:
+        order_date = match.group(match.lastindex)
+        for pattern in _O180_DATE_PATTERNS[: match.lastindex - 1]:
+            better = pattern.search(document_text, match.start() + 1)
+            if better:
+                order_date = better.group(1)
+                break
 
     print(
         f"OneHundred80 processing: Vendor={vendor}, PO={purchase_order}, Date={order_date}"
@@ -2489,8 +2963,6 @@ def process_onehundred80_document(document):
     rows = []
 
     # Process line items with UPC extraction
-    line_items = [e for e in document.entities if e.type_ == "line_item"]
-
     for entity in line_items:
         entity_text = entity.mention_text
 
@@ -2506,36 +2978,39 @@ def process_onehundred80_document(document):
         quantity = ""
 
         # Get data from Document AI properties
-        if hasattr(entity, "properties") and entity.properties:
-            for prop in entity.properties:
-                if prop.type_ == "line_item/product_code":
-                    product_code = prop.mention_text.strip()
-                elif prop.type_ == "line_item/description":
-                    description = prop.mention_text.strip()
-                elif prop.type_ == "line_item/unit_price":
-                    unit_price = clean_price(prop.mention_text)
-                elif prop.type_ == "line_item/quantity":
-                    qty_text = prop.mention_text.strip()
-                    qty_match = re.search(r"\b(\d+)\b", qty_text)
-                    if qty_match:
-                        quantity = qty_match.group(1)
+        for prop in entity.properties:
+            prop_type = prop.type_
+            if prop_type == "line_item/product_code":
+                product_code = prop.mention_text.strip()
+            elif prop_type == "line_item/description":
+                description = prop.mention_text.strip()
+            elif prop_type == "line_item/unit_price":
+                unit_price = clean_price(prop.mention_text)
+            elif prop_type == "line_item/quantity":
+                qty = first_integer(prop.mention_text.strip())
+                if qty:
+                    quantity = qty
+
+        # Only items with all required fields are added, so skip the rest
+        # before the UPC search and description cleanup
+        if not (product_code and unit_price and quantity):
+            continue
 
         # Extract UPC from entity text - look for 12-digit codes
-        upc_match = re.search(r"\b(\d{12})\b", entity_text)
+        upc_match = twelve_digit_upc_pattern(entity_text).search(entity_text)
         if upc_match:
-            upc_code = (
-                f"0{upc_match.group(1)}"  # Add leading zero for standard UPC format
-            )
+            # Add leading zero for standard UPC format
+            upc_code = "0" + upc_match[1]
 
         # Enhance description with logic-based processing
-        if product_code and description:
+        if description:
             # Logic 1: Fix dimension formatting patterns
             # Convert patterns like "575"" to "5-5.75"" or "2" 3.25"" to "2" - 3.25""
-            description = re.sub(
-                r'(\d)(\d+)(\d)"', r'\1-\2.\3"', description
+            description = _DIMENSION_RUN_RE.sub(
+                r'\1-\2.\3"', description
             )  # "575"" → "5-5.75""
-            description = re.sub(
-                r'(\d+\.?\d*)"?\s+(\d+\.?\d*)"', r'\1" - \2"', description
+            description = _DIMENSION_PAIR_RE.sub(
+                r'\1" - \2"', description
             )  # "2" 3.25"" → "2" - 3.25""
 
             # Logic 2: Remove trailing punctuation and whitespace
@@ -2545,7 +3020,7 @@ def process_onehundred80_document(document):
             if len(description) < 30 or "Wrap" in description:
                 # Find this product in the document text to get fuller context
                 product_context = extract_oneHundred80_product_description(
-                    document.text, product_code, upc_code
+                    document_text, product_code, upc_code
                 )
                 if product_context and len(product_context) > len(description):
                     description = product_context
@@ -2554,74 +3029,88 @@ def process_onehundred80_document(document):
             if "\n" in description:
                 lines = description.split("\n")
                 # Keep the longest meaningful line as the main description
-                main_desc = max(lines, key=len) if lines else description
+                main_desc = max(lines, key=len)
+                main_desc_lower = main_desc.lower()
                 # Add additional context from other lines if they add value
                 for line in lines:
+                    stripped = line.strip()
                     if (
-                        line.strip()
+                        len(stripped) > 10
                         and line != main_desc
-                        and len(line.strip()) > 10
-                        and not re.search(
-                            r"(Unit Price|Extended|Price|SKU|UPC|QTY)",
-                            line,
-                            re.IGNORECASE,
-                        )
+                        and not _TABLE_HEADER_RE.search(line)
                     ):
                         # Add complementary information if it doesn't overlap
                         if not any(
-                            word in main_desc.lower()
-                            for word in line.lower().split()[:3]
+                            word in main_desc_lower
+                            for word in line.lower().split(None, 3)[:3]
                         ):
-                            main_desc = f"{main_desc}, {line.strip()}"
+                            main_desc = f"{main_desc}, {stripped}"
+                            main_desc_lower = main_desc.lower()
                 description = main_desc
 
-            # Logic 5: Clean up double commas and extra whitespace
-            description = re.sub(r",\s*,", ",", description)  # Remove double commas
-            description = re.sub(r"\s+", " ", description)  # Normalize whitespace
-            description = description.strip()
+            # Logic 5: Clean up double commas and extra whitespace (str.split()
+            # splits on the same characters as \s, so the join normalizes and
+            # strips the whitespace in one pass)
+            if description.count(",") > 1:
+                description = _DOUBLE_COMMA_RE.sub(",", description)
+            description = " ".join(description.split())
 
             # Logic 6: Remove table headers and invoice artifacts that got mixed in
-            description = re.sub(
-                r"\b(Unit Price|Extended|Price|SKU|UPC|QTY|Order Items|Total Pieces)\b.*",
-                "",
-                description,
-                flags=re.IGNORECASE,
-            )
+            # (the description is a single line now, so cut at the first one)
+            header_match = _TABLE_HEADER_WORD_RE.search(description)
+            if header_match:
+                description = description[: header_match.start()]
             description = description.strip().rstrip(",")
 
         # Create formatted description with UPC
-        if product_code and upc_code and description:
+        if upc_code and description:
             full_description = f"{product_code} - UPC: {upc_code} - {description}"
-        elif product_code and description:
+        elif description:
             full_description = f"{product_code} - {description}"
         else:
             continue  # Skip if we don't have enough info
 
-        # Only add if we have all required fields
-        if product_code and unit_price and quantity:
-            rows.append(
-                [
-                    "",  # Column A placeholder
-                    order_date,
-                    vendor,
-                    purchase_order,
-                    full_description,
-                    unit_price,
-                    quantity,
-                ]
-            )
-            print(f"✓ Added {product_code}: {unit_price} | Qty: {quantity}")
+        rows.append(
+            [
+                "",  # Column A placeholder
+                order_date,
+                vendor,
+                purchase_order,
+                full_description,
+                unit_price,
+                quantity,
+            ]
+        )
+        print(f"✓ Added {product_code}: {unit_price} | Qty: {quantity}")
 
     print(f"OneHundred80 processing completed: {len(rows)} items")
     return rows
 
 
+@functools.lru_cache(maxsize=256)
+def onehundred80_description_pattern(code):
+    """Compile the OneHundred80 pattern for the description after a code's UOM"""
+    return re.compile(
+        rf"{re.escape(code)}.*?(?:EA|ST)\s+(.+?)(?:\$|\d+\.\d{{2}})", re.DOTALL
+    )
+
+
 def extract_oneHundred80_product_description(document_text, product_code, upc_code):
     """Extract fuller product description from OneHundred80 document text using logical patterns"""
 
     # Strategy 1: Find the product code in the document and extract surrounding context
     if product_code in document_text:
-        # Find all occurrences of the product code
+        # Find all occurrences of the product code. The next occurrence can
+        # start no sooner than the code's shortest period (its length, unless
+        # it overlaps itself like "ABAB"), so resume the search from there.
+        step = next(
+            (
+                k
+                for k in range(1, len(product_code))
+                if product_code.startswith(product_code[k:])
+            ),
+            max(len(product_code), 1),
+        )
         product_positions = []
         start = 0
         while True:
@@ -2629,7 +3118,7 @@ def extract_oneHundred80_product_description(document_text, product_code, upc_co
             if pos == -1:
                 break
             product_positions.append(pos)
-            start = pos + 1
+            start = pos + step
 
         # For each occurrence, extract context and find the best description
         best_description = ""
@@ -2643,65 +3132,74 @@ def extract_oneHundred80_product_description(document_text, product_code, upc_co
             # OneHundred80 invoices typically have: SKU UPC QTY UOM Description Unit Price Extended
 
             # Pattern 1: Description after UOM (EA, ST, etc.)
-            desc_pattern1 = (
-                rf"{re.escape(product_code)}.*?(?:EA|ST)\s+(.+?)(?:\$|\d+\.\d{{2}})"
-            )
-            match1 = re.search(desc_pattern1, context, re.DOTALL)
+            match1 = onehundred80_description_pattern(product_code).search(context)
             if match1:
                 candidate = match1.group(1).strip()
-                candidate = re.sub(r"\s+", " ", candidate)  # Normalize whitespace
+                candidate = _WHITESPACE_RE.sub(" ", candidate)  # Normalize whitespace
                 if len(candidate) > len(best_description) and len(candidate) > 10:
                     best_description = candidate
 
-            # Pattern 2: Description on line after product code
-            lines = context.split("\n")
-            for i, line in enumerate(lines):
-                if product_code in line and i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    # Check if next line looks like a description (not just numbers/codes)
-                    if (
-                        len(next_line) > 15
-                        and not re.match(r"^[\d\s\.\$]+$", next_line)
-                        and not re.match(r"^\d{12}$", next_line)
-                    ):
-                        if len(next_line) > len(best_description):
-                            best_description = next_line
+            # Pattern 2: Description on line after product code. Jump between
+            # the code's occurrences with find instead of splitting the whole
+            # window into lines (a code spanning a newline is never on a line).
+            line_start = 0
+            while "\n" not in product_code:
+                found = context.find(product_code, line_start)
+                if found == -1:
+                    break
+                line_end = context.find("\n", found + len(product_code))
+                if line_end == -1:
+                    break  # The code is on the last line
+                next_end = context.find("\n", line_end + 1)
+                if next_end == -1:
+                    next_end = len(context)
+                line_start = line_end + 1
+                # Stripping can only shorten the line, so skip lines too short
+                # to qualify or to beat the current best
+                if next_end - line_start <= max(15, len(best_description)):
+                    continue
+                next_line = context[line_start:next_end].strip()
+                # Check if next line looks like a description (not just numbers/codes)
+                if (
+                    len(next_line) > 15
+                    and not _PRICE_CHARS_LINE_RE.match(next_line)
+                    and not _TWELVE_DIGIT_LINE_RE.match(next_line)
+                ):
+                    if len(next_line) > len(best_description):
+                        best_description = next_line
 
     # Strategy 2: If UPC is available, use it to find description
     if upc_code and not best_description:
         # Remove leading zero from UPC for search
         search_upc = upc_code[1:] if upc_code.startswith("0") else upc_code
-        if search_upc in document_text:
-            # Find UPC and extract description that follows
-            upc_pos = document_text.find(search_upc)
-            if upc_pos != -1:
-                window_start = max(0, upc_pos - 100)
-                window_end = min(len(document_text), upc_pos + 400)
-                context = document_text[window_start:window_end]
-
-                # Look for description after UPC
-                desc_pattern = (
-                    rf"{re.escape(search_upc)}.*?(?:EA|ST)\s+(.+?)(?:\$|\d+\.\d{{2}})"
-                )
-                match = re.search(desc_pattern, context, re.DOTALL)
-                if match:
-                    candidate = match.group(1).strip()
-                    candidate = re.sub(r"\s+", " ", candidate)  # Normalize whitespace
-                    if len(candidate) > 10:
-                        best_description = candidate
+        # Find UPC and extract description that follows
+        upc_pos = document_text.find(search_upc)
+        if upc_pos != -1:
+            window_start = max(0, upc_pos - 100)
+            window_end = min(len(document_text), upc_pos + 400)
+            context = document_text[window_start:window_end]
+
+            # Look for description after UPC
+            match = onehundred80_description_pattern(search_upc).search(context)
+            if match:
+                candidate = match.group(1).strip()
+                candidate = _WHITESPACE_RE.sub(" ", candidate)  # Normalize whitespace
+                if len(candidate) > 10:
+                    best_description = candidate
 
     # Clean up the description
     if best_description:
         # Remove common artifacts
-        best_description = re.sub(r"\s+", " ", best_description)  # Normalize whitespace
+        # Normalize whitespace
+        best_description = _WHITESPACE_RE.sub(" ", best_description)
         best_description = best_description.strip()
 
         # Remove trailing numbers that might be prices or quantities
-        best_description = re.sub(r"\s+\d+\.\d{2}$", "", best_description)
-        best_description = re.sub(r"\s+\d+$", "", best_description)
+        best_description = _TRAILING_PRICE_RE.sub("", best_description)
+        best_description = _TRAILING_NUMBER_RE.sub("", best_description)
 
         # Remove UPC codes if they got included
-        best_description = re.sub(r"\b\d{12,13}\b", "", best_description)
+        best_description = _UPC_RE.sub("", best_description)
 
         # Final cleanup
         best_description = best_description.strip()
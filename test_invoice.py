@@ -53,11 +53,11 @@ def main():
 
     # Step 1: Generate JSON from PDF
     print("📄 Step 1: Generating JSON from PDF...")
-    print(f"Running: document_ai_explorer.py {pdf_file} --save-json")
+    print(f"Running: document_ai_explorer.py {pdf_file} --only json")
 
     try:
         result = subprocess.run(
-            [sys.executable, "document_ai_explorer.py", pdf_file, "--save-json"],
+            [sys.executable, "document_ai_explorer.py", pdf_file, "--only", "json"],
             capture_output=True,
             text=True,
         )
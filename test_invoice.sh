@@ -39,8 +39,8 @@ export DOCUMENT_AI_PROCESSOR_ID="be53c6e3a199a473"
 export GOOGLE_CLOUD_LOCATION="us"
 
 echo "📄 Step 1: Generating JSON from PDF..."
-echo "Running: document_ai_explorer.py $PDF_FILE --save-json"
-python document_ai_explorer.py "$PDF_FILE" --save-json
+echo "Running: document_ai_explorer.py $PDF_FILE --only json"
+python document_ai_explorer.py "$PDF_FILE" --only json
 
 if [ ! -f "$JSON_FILE" ]; then
     echo "❌ Error: Failed to generate JSON file"
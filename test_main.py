@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Regression tests pinning main.py helpers to the original extraction output"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from main import (
+    LineItem,
+    extract_order_date_improved,
+    find_creative_coop_wholesale,
+    find_upc_in_window,
+    index_upcs,
+    rifle_code_patterns,
+    split_combined_line_item,
+)
+
+
+@pytest.mark.parametrize(
+    "numbers, expected",
+    [
+        # Fewer than five numbers never match
+        (["1", "2.50", "1.25", "3"], None),
+        # First price pair at j <= 5 takes its quantity from index 0
+        (["2", "0", "1", "12.00", "6.00", "24.00"], (2, 6.0)),
+        # First price pair at j > 5 takes its quantity from j - 5
+        (["5", "1", "2", "3", "4", "8", "9", "10.00", "5.00", "20.00"], (2, 5.0)),
+        # Equal prices are not a wholesale pair
+        (["1", "0", "0", "5.00", "5.00", "5.00", "4.00"], None),
+        (["3", "0", "0", "5.00", "5.00", "4.00", "9"], (3, 4.0)),
+        # A rising price pair is skipped in favour of the next falling one
+        (["4", "1", "0.00", "2.00", "1.00", "3"], (4, 1.0)),
+    ],
+)
+def test_find_creative_coop_wholesale(numbers, expected):
+    assert find_creative_coop_wholesale(numbers) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Order Date: 04/29/2025", "04/29/25"),
+        ("order date: 1/5/2025", "01/05/25"),
+        ("no date here", ""),
+        # Invalid month and day keep the original text
+        ("Order Date: 13/01/2025", "13/01/2025"),
+        ("Order Date: 04/31/2025", "04/31/2025"),
+        # Feb 29 only exists in leap years
+        ("Order Date: 02/29/2024", "02/29/24"),
+        ("Order Date: 02/29/2025", "02/29/2025"),
+        ("Order Date: 02/29/1900", "02/29/1900"),
+        # Year 0000 is out of range, year 0099 is not
+        ("Order Date: 01/01/0000", "01/01/0000"),
+        ("Order Date: 4/29/0099", "04/29/99"),
+        # Non-ASCII digits go through strptime, which rejects them
+        (
+            "Order Date: \u0660\u0664/\u0662\u0669/\u0662\u0660\u0662\u0665",
+            "\u0660\u0664/\u0662\u0669/\u0662\u0660\u0662\u0665",
+        ),
+    ],
+)
+def test_extract_order_date_improved(text, expected):
+    assert extract_order_date_improved(text) == expected
+
+
+@pytest.mark.parametrize(
+    "description, expected",
+    [
+        # Expected values match the old two passes: trailing "- #C", then "#C"
+        ("#C - #C", ""),
+        ("x #C- #C", "x"),
+        ("Tote - #C  ", "Tote"),
+        ("Card #C Set - #C", "CardSet"),
+        ("Mug #C1 - #C", "Mug1"),
+    ],
+)
+def test_rifle_code_reference_removal(description, expected):
+    _, code_ref_re = rifle_code_patterns("C")
+    assert code_ref_re.sub("", description) == expected
+
+
+def _entity_with_unit_price(price):
+    return SimpleNamespace(
+        properties=[SimpleNamespace(type_="line_item/unit_price", mention_text=price)]
+    )
+
+
+def test_split_combined_line_item_repeats_item_for_repeated_code():
+    text = "DA1234 123456789012 Cotton Embroidered Napkins 8 0 each 5.00\nsee DA1234"
+    item = LineItem(
+        description="DA1234 - UPC: 0123456789012 - Cotton Embroidered Napkins",
+        unit_price="$5.00",
+        quantity="",
+    )
+    assert split_combined_line_item(text, _entity_with_unit_price("$5.00")) == [
+        item,
+        item,
+    ]
+
+
+def test_split_combined_line_item_skips_repeated_code_without_description():
+    entity = _entity_with_unit_price("$5.00")
+    assert split_combined_line_item("DB5678 and DB5678", entity) == []
+
+
+DIGITS = "12345678901234"
+
+
+@pytest.mark.parametrize(
+    "length, expected", [(12, DIGITS[:12]), (13, DIGITS[:13]), (14, None)]
+)
+def test_find_upc_in_window_digit_run_cut_at_start(length, expected):
+    # The window starts inside "9<digits>", leaving `length` digits in it
+    text = f"x 9{DIGITS[:length]} y"
+    assert find_upc_in_window(text, 3, len(text), index_upcs(text)) == expected
+
+
+@pytest.mark.parametrize(
+    "length, expected", [(12, DIGITS[:12]), (13, DIGITS[:13]), (14, None)]
+)
+def test_find_upc_in_window_digit_run_cut_at_end(length, expected):
+    # The window ends inside "<digits>9", leaving `length` digits in it
+    text = f"x {DIGITS[:length]}9 y"
+    assert find_upc_in_window(text, 0, 2 + length, index_upcs(text)) == expected
+
+
+@pytest.mark.parametrize("start, end", [(5, 5), (9, 3)])
+def test_find_upc_in_window_empty_window(start, end):
+    text = "x 123456789012 y"
+    assert find_upc_in_window(text, start, end, index_upcs(text)) is None